@@ -0,0 +1,77 @@
+"""Benchmark response serialization and compression.
+
+Builds grades and task-list payloads shaped like the real responses and
+reports, per response, the body size and the CPU time spent serializing
+and compressing it. Run with: python benchmark_responses.py [iterations]
+"""
+import gzip
+import json
+import sys
+import time
+from fastapi.encoders import jsonable_encoder
+import fast_responses
+
+# A grades page for a busy student: 8 courses with 60 graded assignments each
+def grades_payload(courses: int = 8, assignments: int = 60) -> dict:
+    return {"courses_with_graded_assignments": [
+        {
+            "course_name": f"CSCI{1100 + c} Computer Science {c}",
+            "graded_assignments": [
+                {
+                    "name": f"Problem Set {a}: Recursion and Data Structures",
+                    "due_date": f"2024-10-{1 + a % 28:02d}T03:59:59Z",
+                    "points_possible": 100.0,
+                    "submission_score": 87.5,
+                }
+                for a in range(assignments)
+            ],
+        }
+        for c in range(courses)
+    ]}
+
+# A generated task list for two weeks of work
+def tasks_payload(tasks: int = 40) -> dict:
+    return {"tasks": [
+        {
+            "task": f"Draft outline for essay {t}",
+            "course": f"ENGL{1000 + t % 5} First-Year Writing",
+            "description": "Read the prompt, collect three sources and write a one-page outline with a thesis.",
+            "time_estimate": "2 hours",
+            "due_date": f"2024-11-{1 + t % 14:02d} 23:59:00 UTC",
+        }
+        for t in range(tasks)
+    ]}
+
+# CPU seconds per call of fn, averaged over iterations
+def cpu_per_call(fn, iterations: int) -> float:
+    start = time.process_time()
+    for _ in range(iterations):
+        fn()
+    return (time.process_time() - start) / iterations
+
+def default_serialize(payload) -> bytes:
+    # FastAPI's default path: jsonable_encoder, then JSONResponse's json.dumps
+    return json.dumps(
+        jsonable_encoder(payload), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+def run(iterations: int):
+    print(f"orjson: {'yes' if fast_responses.orjson else 'no'}, brotli: {'yes' if fast_responses.brotli else 'no'}")
+    print(f"{'payload':<8} {'path':<26} {'bytes':>9} {'cpu/resp':>10}")
+
+    for name, payload in (("grades", grades_payload()), ("tasks", tasks_payload())):
+        body = fast_responses.dumps(payload)
+        rows = [
+            ("jsonable_encoder+json", len(default_serialize(payload)), cpu_per_call(lambda: default_serialize(payload), iterations)),
+            ("fast dumps", len(body), cpu_per_call(lambda: fast_responses.dumps(payload), iterations)),
+            ("fast dumps+gzip", len(gzip.compress(body, compresslevel=fast_responses.GZIP_LEVEL)),
+             cpu_per_call(lambda: fast_responses.compress(fast_responses.dumps(payload), "gzip"), iterations)),
+        ]
+        if fast_responses.brotli is not None:
+            rows.append(("fast dumps+brotli", len(fast_responses.compress(body, "br")),
+                         cpu_per_call(lambda: fast_responses.compress(fast_responses.dumps(payload), "br"), iterations)))
+        for path, size, cpu in rows:
+            print(f"{name:<8} {path:<26} {size:>9,} {cpu * 1e6:>8.0f}us")
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -1,130 +1,488 @@
-from canvasapi import Canvas, exceptions
+import asyncio
 import logging
+import os
+import time
+import weakref
+from collections import Counter
 from datetime import datetime, timedelta, timezone
-from dateutil import parser
-
-# Base URL for Canvas API
-BASE_URL = "https://bostoncollege.instructure.com"
+from canvas_cache import cache, negative_cache
+from canvas_client import (
+    BASE_URL, Forbidden, RateLimitExceeded, ResourceDoesNotExist, Unauthorized, get_client, hash_api_key,
+    to_canvas_timestamp,
+)
+from canvas_dates import DueDateIndex, parse_timestamp
+from canvas_graphql import fetch_course_assignments
+from canvas_models import Assignment, Course
+from canvas_store import SHARED_USER_ID, store
+from canvas_sync import submission_sync
 
 # Configure logging for this module
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
-handler = logging.StreamHandler()
-formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-handler.setFormatter(formatter)
-logger.addHandler(handler)
 
-# Create an instance of the Canvas API using the provided API key
+# Limits for fanning out per-course Canvas requests
+MAX_CONCURRENT_FETCHES = int(os.getenv("CANVAS_MAX_CONCURRENT_FETCHES", "32"))
+MAX_CONCURRENT_FETCHES_PER_USER = int(os.getenv("CANVAS_MAX_CONCURRENT_FETCHES_PER_USER", "6"))
+
+# Pin the current enrollment term instead of discovering it (e.g. CANVAS_TERM_ID=7109)
+TERM_ID_OVERRIDE = os.getenv("CANVAS_TERM_ID")
+
+# How long a discovered term ID is trusted before it is resolved again, in seconds
+TERM_CACHE_TTL = 12 * 60 * 60
+
+# Current term shared by all users of this Canvas instance: (term_id, expires_at)
+_current_term = (None, 0.0)
+
+# How grades and upcoming work are fetched: "rest" (the default) or "graphql" (opt-in: one query
+# for all courses, but it bypasses the snapshot store, delta sync, the shared course cache and the
+# planner, and returns every course at once instead of streaming them)
+FETCH_MODE = os.getenv("CANVAS_FETCH_MODE", "rest").lower()
+
+# Default window for upcoming assignments, in days
+DEFAULT_UPCOMING_DAYS = 14
+
+# Planner item types that count as assignments for the task list
+UPCOMING_PLANNABLE_TYPES = ("assignment", "quiz", "discussion_topic")
+
+# Semaphores are created lazily so they bind to the running event loop
+_global_fetch_limit = None
+_user_fetch_limits = weakref.WeakValueDictionary()
+
+def _get_fetch_limits(api_key: str):
+    """Returns the (per-user, global) semaphores bounding course fetches."""
+    global _global_fetch_limit
+    if _global_fetch_limit is None:
+        _global_fetch_limit = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+    key = hash_api_key(api_key)
+    user_limit = _user_fetch_limits.get(key)
+    if user_limit is None:
+        user_limit = asyncio.Semaphore(MAX_CONCURRENT_FETCHES_PER_USER)
+        _user_fetch_limits[key] = user_limit
+    return user_limit, _global_fetch_limit
+
+# Get the pooled async Canvas client for the provided API key
 def get_canvas_instance(api_key: str):
-    """Helper function to create a Canvas instance."""
-    logger.info("Creating a Canvas instance")
-    return Canvas(BASE_URL, api_key)
+    """Helper function to get a Canvas client."""
+    return get_client(api_key)
+
+# Get the Canvas user that owns the API key
+async def get_current_user(api_key: str):
+    """Fetches the profile of the user the API key belongs to (memoized per client)."""
+    canvas = get_canvas_instance(api_key)
+    return await canvas.get_current_user()
+
+# Write fetched data to the snapshot store without failing the request
+async def _save_snapshot(save, *args):
+    try:
+        await save(*args)
+    except Exception as e:
+        logger.warning("Failed to write Canvas snapshot: %s", e)
+
+# Get the courses the user is actively enrolled in (cached)
+async def list_courses(api_key: str):
+    """Fetches the user's active courses, with their terms, through the Canvas cache and snapshot store."""
+    canvas = get_canvas_instance(api_key)
+    user_key = hash_api_key(api_key)
+
+    async def fetch():
+        # Let Canvas drop concluded and unpublished enrollments instead of paging through them
+        courses = await canvas.get_paginated("/api/v1/courses", params={
+            "enrollment_state": "active",
+            "state[]": "available",
+            "include[]": "term",
+        }, parse=Course.from_json)
+        await _save_snapshot(store.save_courses, user_key, courses)
+        return courses
+
+    return await cache.get_or_fetch(("courses", user_key), fetch, load=lambda: store.load_courses(user_key))
+
+# Make sure the token can see a course before serving shared course data
+async def _check_course_access(api_key: str, course_id: int):
+    """Raises Forbidden unless course_id is one of the user's active courses."""
+    courses = await list_courses(api_key)
+    if not any(course.id == course_id for course in courses):
+        raise Forbidden(f"Course {course_id} is not among this user's active courses", 403)
+
+# Get all the assignments in a course (cached once per course and shared by all its students)
+async def get_assignments(api_key: str, course_id: int):
+    """Fetches a course's assignments through the shared course cache and snapshot store."""
+    # Names, due dates and points are the same for every student, so only the access
+    # check is per user; whichever student misses first fetches for the whole course
+    await _check_course_access(api_key, course_id)
+    canvas = get_canvas_instance(api_key)
+    fetched_with_own_token = False
+
+    async def fetch():
+        nonlocal fetched_with_own_token
+        fetched_with_own_token = True
+        assignments = await canvas.get_paginated(
+            f"/api/v1/courses/{course_id}/assignments", parse=Assignment.from_json
+        )
+        await _save_snapshot(store.save_assignments, SHARED_USER_ID, course_id, assignments)
+        return assignments
+
+    try:
+        return await cache.get_or_fetch(
+            ("assignments", course_id), fetch,
+            load=lambda: store.load_assignments(SHARED_USER_ID, course_id),
+        )
+    except (Forbidden, Unauthorized, ResourceDoesNotExist) as e:
+        if fetched_with_own_token:
+            raise
+        # The shared fetch ran with another student's token, so its denial or
+        # throttling says nothing about this user; retry with their own token
+        logger.info("Shared assignment fetch for course ID %s failed (%s); using this user's token",
+                    course_id, e.status_code)
+        return await get_user_assignments(api_key, course_id)
+
+# Get a course's assignments as this user sees them (cached per user)
+async def get_user_assignments(api_key: str, course_id: int):
+    """Fetches the assignments visible to this user, including section-only ones the shared list can miss."""
+    canvas = get_canvas_instance(api_key)
+    user_key = hash_api_key(api_key)
+
+    async def fetch():
+        assignments = await canvas.get_paginated(
+            f"/api/v1/courses/{course_id}/assignments", parse=Assignment.from_json
+        )
+        await _save_snapshot(store.save_assignments, user_key, course_id, assignments)
+        return assignments
+
+    return await cache.get_or_fetch(
+        ("assignments", course_id, user_key), fetch,
+        load=lambda: store.load_assignments(user_key, course_id),
+    )
+
+# Add the assignments behind any of the user's scores that the shared list doesn't have
+async def _with_missing_assignments(api_key: str, course_id: int, assignments: list, submissions: list):
+    """Returns assignments plus any the user was graded on that are missing from the shared course list."""
+    # The shared list comes from whichever student fetched first, so assignments
+    # assigned only to other sections (or overrides) may not be in it
+    known = {assignment.id for assignment in assignments}
+    missing = {submission.assignment_id for submission in submissions
+               if submission.score is not None and submission.assignment_id not in known}
+    if not missing:
+        return assignments
+    logger.info("Fetching this user's assignments for course ID %s: %s graded assignments not in the shared list",
+                course_id, len(missing))
+    own = await get_user_assignments(api_key, course_id)
+    return assignments + [assignment for assignment in own if assignment.id in missing]
+
+# Work out which enrollment term is current from the terms attached to a course list
+def _discover_term(courses: list):
+    """Returns the ID of the term in progress today, else the term with the most courses."""
+    now = datetime.now(timezone.utc)
+    in_progress = Counter()
+    all_terms = Counter()
+    for course in courses:
+        term_id = course.enrollment_term_id
+        if term_id is None:
+            continue
+        all_terms[term_id] += 1
+        start_at, end_at = course.term_start_at, course.term_end_at
+        if start_at and end_at and parse_timestamp(start_at) <= now <= parse_timestamp(end_at):
+            in_progress[term_id] += 1
+    for counts in (in_progress, all_terms):
+        if counts:
+            return counts.most_common(1)[0][0]
+    return None
+
+# Get the ID of the current enrollment term, discovering and caching it as needed
+def resolve_current_term(courses: list):
+    """Returns the current term ID, reusing the cached one while it matches the user's courses."""
+    global _current_term
+    if TERM_ID_OVERRIDE:
+        return int(TERM_ID_OVERRIDE)
+
+    term_ids = {course.enrollment_term_id for course in courses}
+    term_id, expires_at = _current_term
+    if term_id is not None and time.monotonic() < expires_at and term_id in term_ids:
+        return term_id
+
+    discovered = _discover_term(courses)
+    if discovered is not None and (term_id is None or time.monotonic() >= expires_at):
+        # Only replace the shared term once it expires; a user outside it shouldn't reset it for everyone
+        _current_term = (discovered, time.monotonic() + TERM_CACHE_TTL)
+        logger.info("Discovered current enrollment term ID: %s", discovered)
+    return discovered
 
 # Get all the courses a user is currently enrolled in 
-def get_courses(api_key: str):
+async def get_courses(api_key: str):
     """Fetches the list of courses for the user, filtering for the current term."""
     logger.info("Fetching courses from Canvas")
-    current_term_id = 7109  # Define the current term ID here
     try:
-        canvas = get_canvas_instance(api_key)
-        user = canvas.get_current_user()
-        courses = user.get_courses()
+        courses = await list_courses(api_key)
+        current_term_id = resolve_current_term(courses)
         
         # Filter courses by enrollment term ID
-        course_list = [course for course in courses if getattr(course, 'enrollment_term_id', None) == current_term_id]
+        course_list = [course for course in courses if course.enrollment_term_id == current_term_id]
         
-        logger.info(f"Retrieved {len(course_list)} courses for the current term (term ID: {current_term_id})")
-        if course_list:
-            logger.info(f"Attributes of the first course object: {course_list[0].__dict__}")
-            
+        logger.info("Retrieved %s courses for the current term (term ID: %s)", len(course_list), current_term_id)
         return course_list
     except Exception as e:
-        logger.error(f"Error fetching courses: {str(e)}", exc_info=True)
+        logger.error("Error fetching courses: %s", e, exc_info=True)
         raise
 
+# Get all of the user's submissions for a course, syncing only what changed
+async def get_submissions(api_key: str, course_id: int):
+    """Fetches the calling user's submissions for every assignment in a course (cached)."""
+    canvas = get_canvas_instance(api_key)
+    user_key = hash_api_key(api_key)
+    # Omitting student_ids[] returns only the calling user's submissions; after the
+    # first load the sync engine asks Canvas only for changes since its watermark
+    return await cache.get_or_fetch(
+        ("submissions", user_key, course_id),
+        lambda: submission_sync.sync(canvas, user_key, course_id),
+        load=lambda: submission_sync.load(user_key, course_id),
+    )
+
+# Get the assignments and the user's submissions for all courses through GraphQL (cached)
+async def get_course_assignments_graphql(api_key: str, courses: list):
+    """Fetches {course_id: (assignments, submissions) or None} for the courses in one paginated query.
+
+    Courses in the negative cache are left out of the result.
+    """
+    canvas = get_canvas_instance(api_key)
+    user_key = hash_api_key(api_key)
+    # Key on the full course list so the entry stays valid as negative-cache entries come and go
+    course_ids = [course.id for course in courses]
+    by_course = await cache.get_or_fetch(
+        ("graphql", user_key, tuple(course_ids)),
+        lambda: fetch_course_assignments(canvas, course_ids),
+    )
+    for course_id, result in by_course.items():
+        if result is None:
+            negative_cache.remember(user_key, course_id, 403)
+    return {
+        course_id: result for course_id, result in by_course.items()
+        if negative_cache.lookup(user_key, course_id) is None
+    }
+
+# Join a course's assignments with the user's submissions into the grades page shape
+def _graded_assignments(assignments: list, submissions: list):
+    """Returns the graded assignments, in the dict shape the frontend expects."""
+    # Join the user's submissions to their assignments in memory
+    submissions_by_assignment = {submission.assignment_id: submission for submission in submissions}
+    graded_assignments = []
+    
+    for assignment in assignments:
+        # Only add assignments that have been graded
+        if assignment.has_submitted_submissions and assignment.points_possible:
+            submission = submissions_by_assignment.get(assignment.id)
+            
+            # Check if the submission has a 'score' attribute and if it's graded
+            submission_score = submission.score if submission else None
+            if submission_score is not None:
+                graded_assignments.append({
+                    "name": assignment.name,
+                    "due_date": assignment.due_at,
+                    "points_possible": assignment.points_possible,
+                    "submission_score": submission_score
+                })
+    return graded_assignments
+
 # Get all the graded assignments for a user 
-def get_graded_assignments(api_key: str, course_id: int):
+async def get_graded_assignments(api_key: str, course_id: int):
     """Fetches graded assignments for a specific course."""
-    logger.info(f"Fetching graded assignments for course ID: {course_id}")
+    user_key = hash_api_key(api_key)
+    status = negative_cache.lookup(user_key, course_id)
+    if status is not None:
+        logger.info("Skipping course ID %s: Canvas returned %s recently", course_id, status)
+        return []
+    logger.info("Fetching graded assignments for course ID: %s", course_id)
     try:
-        canvas = get_canvas_instance(api_key)
-        user = canvas.get_current_user()
-        course = canvas.get_course(course_id)
-        assignments = course.get_assignments()
-        
-        graded_assignments = []
-        
-        for assignment in assignments:
-            # Only add assignments that have been graded
-            if assignment.has_submitted_submissions and assignment.points_possible:
-                submission = assignment.get_submission(user.id)
-                
-                # Check if the submission has a 'score' attribute and if it's graded
-                submission_score = getattr(submission, 'score', None) if submission else None
-                if submission_score is not None:
-                    graded_assignments.append({
-                        "name": assignment.name,
-                        "due_date": assignment.due_at,
-                        "points_possible": assignment.points_possible,
-                        "submission_score": submission_score
-                    })
+        assignments, submissions = await asyncio.gather(
+            get_assignments(api_key, course_id),
+            get_submissions(api_key, course_id),
+        )
+        assignments = await _with_missing_assignments(api_key, course_id, assignments, submissions)
+        graded_assignments = _graded_assignments(assignments, submissions)
         
-        logger.info(f"Retrieved {len(graded_assignments)} graded assignments for course ID: {course_id}")
+        logger.info("Retrieved %s graded assignments for course ID: %s", len(graded_assignments), course_id)
         return graded_assignments
-    except exceptions.Forbidden as e:
-        logger.warning(f"Access denied for course ID {course_id}: {str(e)}")
+    except RateLimitExceeded:
+        # Still throttled after queueing and retries; surface it rather than report no grades
+        logger.error("Canvas rate limit exhausted for course ID %s", course_id)
+        raise
+    except (Forbidden, Unauthorized, ResourceDoesNotExist) as e:
+        # Remember the denial so the next load skips this course without a round trip
+        negative_cache.remember(user_key, course_id, e.status_code)
+        logger.warning("Access denied for course ID %s (%s): %s", course_id, e.status_code, e)
         return []  # Skip this course if access is denied
     except Exception as e:
-        logger.error(f"Error fetching graded assignments for course ID {course_id}: {str(e)}", exc_info=True)
+        logger.error("Error fetching graded assignments for course ID %s: %s", course_id, e, exc_info=True)
         return []  # Return an empty list on any other exception
 
+# Yield each course's graded assignments as soon as they are ready
+async def iter_graded_assignments_for_courses(api_key: str, courses: list):
+    """Yields (course, graded_assignments) pairs in completion order.
+
+    In GraphQL mode all courses come back from one paginated query; if that
+    fails the concurrent REST path below is used instead.
+    """
+    if FETCH_MODE == "graphql" and courses:
+        by_course = None
+        try:
+            by_course = await get_course_assignments_graphql(api_key, courses)
+        except RateLimitExceeded:
+            raise
+        except Exception as e:
+            logger.warning("GraphQL fetch failed, falling back to REST: %s", e)
+        if by_course is not None:
+            # Courses the token can't see come back as None and are skipped like Forbidden ones
+            for course in courses:
+                yield course, _graded_assignments(*by_course[course.id]) if by_course.get(course.id) else []
+            return
+
+    user_limit, global_limit = _get_fetch_limits(api_key)
+
+    async def fetch(course):
+        # Take the per-user slot first so one user can't hold global slots while queued
+        async with user_limit:
+            async with global_limit:
+                return course, await get_graded_assignments(api_key, course.id)
+
+    tasks = [asyncio.ensure_future(fetch(course)) for course in courses]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Stop outstanding fetches if the consumer goes away early
+        for task in tasks:
+            task.cancel()
+
+# Get the graded assignments for several courses at once
+async def get_graded_assignments_for_courses(api_key: str, courses: list):
+    """Fetches graded assignments for each course concurrently, returned in course order."""
+    graded = {course.id: graded_assignments
+              async for course, graded_assignments in iter_graded_assignments_for_courses(api_key, courses)}
+    return [graded[course.id] for course in courses]
+
 # Get all courses and their graded assignments for a user
-def get_courses_with_graded_assignments(api_key: str):
+async def get_courses_with_graded_assignments(api_key: str):
     """Fetches courses and their graded assignments, handling access errors."""
-    courses = get_courses(api_key)
-    all_graded_assignments = {}
+    courses = await get_courses(api_key)
+    graded = await get_graded_assignments_for_courses(api_key, courses)
     
-    for course in courses:
-        graded_assignments = get_graded_assignments(api_key, course.id)
-        all_graded_assignments[course.id] = graded_assignments
-    
-    return all_graded_assignments
+    return {course.id: graded_assignments for course, graded_assignments in zip(courses, graded)}
 
-# Get all the upcoming assignments due in the next two weeks
-def get_upcoming_assignments(api_key: str):
-    """Fetches upcoming assignments due in the next two weeks."""
-    logger.info("Fetching upcoming assignments due in the next two weeks")
-    try:
-        canvas = get_canvas_instance(api_key)
-        user = canvas.get_current_user()
-        courses = user.get_courses()
+# Get upcoming assignments from the same GraphQL query that backs the grades page
+async def _get_upcoming_graphql(api_key: str, courses: list, course_names: dict, start: datetime, end: datetime):
+    """Returns the upcoming assignments due in [start, end] using the cached GraphQL course data."""
+    by_course = await get_course_assignments_graphql(api_key, courses)
+    assignments = [
+        assignment
+        for course in courses if by_course.get(course.id)
+        for assignment in by_course[course.id][0]
+    ]
+    return [
+        {
+            "course_name": course_names.get(assignment.course_id),
+            "assignment_name": assignment.name,
+            "due_date": due_date.strftime("%Y-%m-%d %H:%M:%S %Z")
+        }
+        for due_date, assignment in DueDateIndex(assignments).due_between(start, end)
+    ]
 
-        # Parse courses
-        courses = [course for course in courses if getattr(course, 'enrollment_term_id', None) == 7109]
+# Keep only the planner item fields the task list uses
+def _planner_item(item: dict) -> dict:
+    plannable = item.get('plannable') or {}
+    return {
+        "plannable_type": item.get('plannable_type'),
+        "course_id": item.get('course_id'),
+        "context_name": item.get('context_name'),
+        "plannable_date": item.get('plannable_date'),
+        "plannable": {
+            "title": plannable.get('title'),
+            "name": plannable.get('name'),
+            "due_at": plannable.get('due_at'),
+        },
+    }
+
+# Get all the upcoming assignments due in the next few days
+async def get_upcoming_assignments(api_key: str, days: int = DEFAULT_UPCOMING_DAYS, progress=None):
+    """Fetches assignments due in the next `days` days with a single planner query.
+
+    `progress`, if given, is called as progress(event, data) when the courses
+    are listed and once the upcoming work for the courses it could fetch is in hand.
+    """
+    logger.info("Fetching upcoming assignments due in the next %s days", days)
+    report = progress or (lambda event, data: None)
+    try:
+        courses = await get_courses(api_key)
+        report("courses_listed", {"courses": len(courses)})
+        if not courses:
+            return []
 
         # Define the date range for upcoming assignments (make them timezone-aware)
         today = datetime.now(timezone.utc)
-        two_weeks_later = today + timedelta(days=14)
+        window_end = today + timedelta(days=days)
+
+        course_names = {course.id: course.name for course in courses}
+
+        if FETCH_MODE == "graphql":
+            try:
+                upcoming_assignments = await _get_upcoming_graphql(api_key, courses, course_names, today, window_end)
+                user_key = hash_api_key(api_key)
+                report("upcoming_fetched", {
+                    "courses": sum(1 for course in courses if negative_cache.lookup(user_key, course.id) is None),
+                    "assignments": len(upcoming_assignments),
+                })
+                logger.info("Retrieved %s upcoming assignments due in the next %s days", len(upcoming_assignments), days)
+                return upcoming_assignments
+            except RateLimitExceeded:
+                raise
+            except Exception as e:
+                logger.warning("GraphQL fetch failed, falling back to REST: %s", e)
+
+        # Without any context codes the planner would return items from every course, not none
+        user_key = hash_api_key(api_key)
+        context_codes = [
+            f"course_{course.id}" for course in courses if negative_cache.lookup(user_key, course.id) is None
+        ]
+        if not context_codes:
+            report("upcoming_fetched", {"courses": 0, "assignments": 0})
+            logger.info("No accessible courses to fetch upcoming assignments for")
+            return []
+
+        # One planner request covers every course; Canvas filters by date server-side.
+        # Cached and stored per user so a cold process can answer from disk, and the
+        # due dates below are re-sliced against the current window on every call
+        canvas = get_canvas_instance(api_key)
+
+        async def fetch():
+            items = await canvas.get_paginated("/api/v1/planner/items", params={
+                "start_date": to_canvas_timestamp(today),
+                "end_date": to_canvas_timestamp(window_end),
+                "context_codes[]": context_codes,
+            }, parse=_planner_item)
+            items = [item for item in items if item['plannable_type'] in UPCOMING_PLANNABLE_TYPES]
+            await _save_snapshot(store.save_planner_items, user_key, days, items)
+            return items
+
+        items = await cache.get_or_fetch(
+            ("planner", user_key, days), fetch, load=lambda: store.load_planner_items(user_key, days)
+        )
+
+        # Parse all due dates in one pass and slice the window out of the sorted index
+        due_dates = DueDateIndex(
+            items, due_at=lambda item: (item.get('plannable') or {}).get('due_at') or item.get('plannable_date')
+        )
 
         upcoming_assignments = []
 
-        for course in courses:
-            assignments = course.get_assignments()
-            for assignment in assignments:
-                if assignment.due_at:
-                    # Parse the due_at date string to an aware datetime object
-                    due_date = parser.parse(assignment.due_at)
-
-                    # Compare the parsed due date with today and two weeks later
-                    if today <= due_date <= two_weeks_later:
-                        upcoming_assignments.append({
-                            "course_name": course.name,
-                            "assignment_name": assignment.name,
-                            "due_date": due_date.strftime("%Y-%m-%d %H:%M:%S %Z")
-                        })
-
-        logger.info(f"Retrieved {len(upcoming_assignments)} upcoming assignments due in the next two weeks")
+        for due_date, item in due_dates.due_between(today, window_end):
+            plannable = item.get('plannable') or {}
+            upcoming_assignments.append({
+                "course_name": course_names.get(item.get('course_id')) or item.get('context_name'),
+                "assignment_name": plannable.get('title') or plannable.get('name'),
+                "due_date": due_date.strftime("%Y-%m-%d %H:%M:%S %Z")
+            })
+
+        # The planner answers for every course in one request, so there is one progress step, not one per course
+        report("upcoming_fetched", {"courses": len(context_codes), "assignments": len(upcoming_assignments)})
+        logger.info("Retrieved %s upcoming assignments due in the next %s days", len(upcoming_assignments), days)
         return upcoming_assignments
     except Exception as e:
-        logger.error(f"Error fetching upcoming assignments: {str(e)}", exc_info=True)
+        logger.error("Error fetching upcoming assignments: %s", e, exc_info=True)
         raise
\ No newline at end of file
@@ -0,0 +1,232 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+
+# Configure logging for this module
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# How long each kind of Canvas data is served without revalidating, in seconds
+RESOURCE_TTLS = {
+    "courses": 60 * 60,
+    "assignments": 15 * 60,
+    "submissions": 2 * 60,
+    "graphql": 2 * 60,
+    "planner": 5 * 60,
+}
+
+# How long past its TTL an entry may still be served while it is refreshed
+STALE_TTL = 24 * 60 * 60
+
+# Upper bound on the approximate size of everything held in the cache
+MAX_CACHE_BYTES = int(os.getenv("CANVAS_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Estimate how many bytes a cached value takes up
+def estimate_size(value) -> int:
+    """Approximates the size of a JSON-like value by its serialized length."""
+    return len(json.dumps(value, default=str))
+
+# Coalesce identical concurrent fetches into one upstream call
+class SingleFlight:
+    """Runs at most one call per key at a time; concurrent callers share its result."""
+
+    def __init__(self):
+        self.calls = {}
+        self.leaders = 0
+        self.absorbed = 0
+
+    async def do(self, key: tuple, fetch):
+        """Awaits the in-flight call for key, or starts fetch() if there is none."""
+        future = self.calls.get(key)
+        if future is None:
+            self.leaders += 1
+            future = asyncio.ensure_future(fetch())
+            self.calls[key] = future
+            future.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.absorbed += 1
+        # Shield so one caller disconnecting doesn't cancel the fetch for everyone else
+        return await asyncio.shield(future)
+
+    def _finish(self, key: tuple, future):
+        if self.calls.get(key) is future:
+            del self.calls[key]
+        if not future.cancelled():
+            future.exception()  # Mark retrieved even if every caller went away
+
+    def stats(self) -> dict:
+        """Returns how many upstream calls ran and how many duplicates were absorbed."""
+        return {"in_flight": len(self.calls), "upstream_calls": self.leaders, "duplicates_absorbed": self.absorbed}
+
+# How long a course the token could not access is skipped, in seconds
+NEGATIVE_TTL = int(os.getenv("CANVAS_NEGATIVE_CACHE_TTL", str(30 * 60)))
+
+# Upper bound on remembered inaccessible courses
+MAX_NEGATIVE_ENTRIES = 10000
+
+# Remember courses a token can't access so they are skipped without a request
+class NegativeCache:
+    """Maps (token hash, course_id) to the 401/403/404 status Canvas returned, for NEGATIVE_TTL seconds."""
+
+    def __init__(self, ttl: float = NEGATIVE_TTL, max_entries: int = MAX_NEGATIVE_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.skips = 0
+
+    def remember(self, user_key: str, course_id: int, status: int):
+        """Records that course_id returned status for this token."""
+        key = (user_key, course_id)
+        self.entries.pop(key, None)
+        self.entries[key] = (status, time.monotonic() + self.ttl)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def lookup(self, user_key: str, course_id: int):
+        """Returns the remembered status for (token, course), or None if unknown or expired."""
+        key = (user_key, course_id)
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        status, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del self.entries[key]
+            return None
+        self.skips += 1
+        return status
+
+    def stats(self) -> dict:
+        """Returns the number of remembered courses and skipped lookups."""
+        return {"entries": len(self.entries), "skipped_requests": self.skips}
+
+# A single cached value and its freshness deadlines
+class CacheEntry:
+    __slots__ = ("value", "size", "fresh_until", "stale_until")
+
+    def __init__(self, value, size: int, ttl: float):
+        now = time.monotonic()
+        self.value = value
+        self.size = size
+        self.fresh_until = now + ttl
+        self.stale_until = now + ttl + STALE_TTL
+
+# Size-bounded LRU cache with per-resource TTLs and stale-while-revalidate
+class CanvasCache:
+    """Caches Canvas responses, serving stale entries while refreshing them in the background."""
+
+    def __init__(self, max_bytes: int = MAX_CACHE_BYTES, ttls: dict = None):
+        self.max_bytes = max_bytes
+        self.ttls = dict(RESOURCE_TTLS if ttls is None else ttls)
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.refreshing = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Returns the entry for key if it exists and is within its stale window."""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() >= entry.stale_until:
+            self.delete(key)
+            return None
+        self.entries.move_to_end(key)
+        return entry
+
+    def set(self, key, value, ttl: float = None):
+        """Stores value under key and evicts least recently used entries past the byte bound."""
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            logger.warning("Not caching %s entry of %s bytes (limit %s)", key[0], size, self.max_bytes)
+            return
+        self.delete(key)
+        self.entries[key] = CacheEntry(value, size, self.ttls.get(key[0], 0) if ttl is None else ttl)
+        self.total_bytes += size
+        while self.total_bytes > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.total_bytes -= evicted.size
+
+    def delete(self, key):
+        """Removes key from the cache if present."""
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry.size
+
+    def clear(self):
+        """Empties the cache."""
+        self.entries.clear()
+        self.total_bytes = 0
+
+    async def get_or_fetch(self, key: tuple, fetch, load=None):
+        """Returns the cached value for key, calling fetch() on a miss.
+
+        key[0] names the resource and selects its TTL. Stale entries are returned
+        immediately and refreshed by a background task. On a miss, load() (if
+        given) may return a persisted copy, which is served as stale.
+        """
+        entry = self.get(key)
+        if entry is not None:
+            if time.monotonic() < entry.fresh_until:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+                self._schedule_refresh(key, fetch)
+            return entry.value
+
+        self.misses += 1
+        return await single_flight.do(key, lambda: self._fill(key, fetch, load))
+
+    async def _fill(self, key: tuple, fetch, load):
+        """Loads a persisted copy or fetches key, then stores it."""
+        if load is not None:
+            # The persisted copy is only a cache; if it can't be read, go to Canvas
+            try:
+                value = await load()
+            except Exception as e:
+                logger.warning("Failed to read Canvas snapshot for %s: %s", key[0], e)
+                value = None
+            if value is not None:
+                self.set(key, value, ttl=0)
+                self._schedule_refresh(key, fetch)
+                return value
+
+        value = await fetch()
+        self.set(key, value)
+        return value
+
+    def _schedule_refresh(self, key: tuple, fetch):
+        """Starts a background refresh for key unless one is already running."""
+        if key in self.refreshing:
+            return
+
+        async def refresh():
+            try:
+                self.set(key, await fetch())
+            except Exception as e:
+                # Keep serving the stale value; the next request will try again
+                logger.warning("Background refresh of %s failed: %s", key[0], e)
+            finally:
+                self.refreshing.pop(key, None)
+
+        self.refreshing[key] = asyncio.create_task(refresh())
+
+    def stats(self) -> dict:
+        """Returns hit/miss counters and current size."""
+        return {
+            "entries": len(self.entries),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+        }
+
+# Single-flight registry and caches shared by all Canvas lookups in this process
+single_flight = SingleFlight()
+cache = CanvasCache()
+negative_cache = NegativeCache()
@@ -0,0 +1,269 @@
+import asyncio
+import hashlib
+import httpx
+import logging
+import time
+from datetime import datetime, timezone
+from canvas_ratelimit import MAX_THROTTLE_RETRIES, AdaptiveRateLimiter
+
+# Base URL for Canvas API
+BASE_URL = "https://bostoncollege.instructure.com"
+
+# Canvas caps per_page at 100 for most list endpoints
+PER_PAGE = 100
+
+# How many numbered pages of one listing may be fetched at the same time
+PREFETCH_WINDOW = 4
+
+# Configure logging for this module
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# How long a pooled client may sit unused before it is evicted, in seconds
+CLIENT_IDLE_TIMEOUT = 15 * 60
+
+# How long the /users/self identity is memoized per client, in seconds
+CURRENT_USER_TTL = 10 * 60
+
+# Shared HTTP client, created on first use and reused by every request
+_http_client = None
+
+# Pooled CanvasClient instances, keyed by hash_api_key()
+_client_pool = {}
+_last_pool_sweep = 0.0
+
+# Errors raised for Canvas responses (names mirror canvasapi.exceptions)
+class CanvasException(Exception):
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+class BadRequest(CanvasException):
+    pass
+
+class InvalidAccessToken(CanvasException):
+    pass
+
+class Unauthorized(CanvasException):
+    pass
+
+class Forbidden(CanvasException):
+    pass
+
+class RateLimitExceeded(Forbidden):
+    pass
+
+class ResourceDoesNotExist(CanvasException):
+    pass
+
+# Hash an API key so it can be used as a cache or registry key without storing the token
+def hash_api_key(api_key: str) -> str:
+    """Returns a stable, non-reversible identifier for an API key."""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+# Format a datetime the way the Canvas API expects
+def to_canvas_timestamp(value: datetime) -> str:
+    """Formats an aware datetime as an ISO 8601 UTC timestamp."""
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+# Get the shared httpx client, creating it if needed
+def get_http_client() -> httpx.AsyncClient:
+    """Returns the process-wide AsyncClient used for all Canvas requests."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        logger.info("Creating shared Canvas HTTP client")
+        _http_client = httpx.AsyncClient(
+            base_url=BASE_URL,
+            timeout=httpx.Timeout(20.0, connect=5.0),
+            # Keep idle connections to BASE_URL warm between page loads
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=120.0),
+        )
+    return _http_client
+
+# Open a pooled connection to Canvas before the first user request needs it
+async def warm_up():
+    """Completes DNS, TCP and TLS setup to BASE_URL so the connection sits in the pool."""
+    response = await get_http_client().head("/")
+    logger.info("Warmed up Canvas connection (%s)", response.status_code)
+
+# Close the shared httpx client (called on application shutdown)
+async def close_http_client():
+    """Closes the shared AsyncClient and its pooled connections."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+# Turn an error response into the matching Canvas exception
+def raise_for_status(response: httpx.Response):
+    """Raises a CanvasException subclass for non-2xx responses."""
+    status = response.status_code
+    if status < 400:
+        return
+    message = response.text
+    if status == 400:
+        raise BadRequest(message, status)
+    if status == 401:
+        if "WWW-Authenticate" in response.headers:
+            raise InvalidAccessToken(message, status)
+        raise Unauthorized(message, status)
+    if status == 403:
+        if "Rate Limit Exceeded" in message:
+            raise RateLimitExceeded(message, status)
+        raise Forbidden(message, status)
+    if status == 404:
+        raise ResourceDoesNotExist("Not Found", status)
+    raise CanvasException(f"Canvas returned {status}: {message}", status)
+
+# Work out the URLs of pages 2..N when Canvas uses numbered pages
+def _numbered_page_urls(response: httpx.Response) -> list:
+    """Returns the remaining page URLs if the Link header has numeric next/last pages, else []."""
+    next_url = response.links.get("next", {}).get("url")
+    last_url = response.links.get("last", {}).get("url")
+    if not next_url or not last_url:
+        return []
+    next_url, last_url = httpx.URL(next_url), httpx.URL(last_url)
+    next_page, last_page = next_url.params.get("page", ""), last_url.params.get("page", "")
+    if not (next_page.isdigit() and last_page.isdigit()):
+        return []
+    return [str(next_url.copy_set_param("page", str(n))) for n in range(int(next_page), int(last_page) + 1)]
+
+# Decode one page of a list response, optionally projecting each item
+def _page_items(response: httpx.Response, parse=None) -> list:
+    data = response.json()
+    return data if parse is None else [parse(item) for item in data]
+
+# Async Canvas client bound to a single user's API key
+class CanvasClient:
+    """Thin async wrapper around the Canvas REST API for one access token."""
+
+    def __init__(self, api_key: str):
+        self.api_key = api_key
+        self.headers = {"Authorization": f"Bearer {api_key}"}
+        self.last_used = time.monotonic()
+        self._current_user = None
+        self._current_user_expires = 0.0
+        self._current_user_lock = None
+        self.rate_limiter = AdaptiveRateLimiter()
+
+    async def get_current_user(self):
+        """Returns the /users/self profile, memoized for CURRENT_USER_TTL seconds."""
+        if self._current_user is not None and time.monotonic() < self._current_user_expires:
+            return self._current_user
+        if self._current_user_lock is None:
+            self._current_user_lock = asyncio.Lock()
+        async with self._current_user_lock:
+            # Another caller may have refreshed it while we waited
+            if self._current_user is None or time.monotonic() >= self._current_user_expires:
+                self._current_user = await self.get("/api/v1/users/self")
+                self._current_user_expires = time.monotonic() + CURRENT_USER_TTL
+        return self._current_user
+
+    async def request(self, method: str, path: str, params=None, json=None) -> httpx.Response:
+        """Sends a request to Canvas and raises on error responses.
+
+        Requests queue behind the token's adaptive rate limiter, and throttled
+        responses are retried with backoff before RateLimitExceeded is raised.
+        """
+        for attempt in range(MAX_THROTTLE_RETRIES + 1):
+            await self.rate_limiter.acquire()
+            try:
+                response = await get_http_client().request(
+                    method, path, params=params, json=json, headers=self.headers
+                )
+            finally:
+                await self.rate_limiter.release()
+
+            if response.status_code == 403 and "Rate Limit Exceeded" in response.text:
+                self.rate_limiter.record_throttled()
+                if attempt < MAX_THROTTLE_RETRIES:
+                    delay = self.rate_limiter.backoff(attempt)
+                    logger.warning("Canvas throttled a request; retrying in %.1fs", delay)
+                    await asyncio.sleep(delay)
+                    continue
+            else:
+                self.rate_limiter.record_response(response.headers)
+            raise_for_status(response)
+            return response
+
+    async def get(self, path: str, params=None):
+        """GETs a single Canvas resource and returns the parsed JSON."""
+        response = await self.request("GET", path, params=params)
+        return response.json()
+
+    async def get_paginated(self, path: str, params=None, parse=None) -> list:
+        """GETs a Canvas list endpoint and every following page.
+
+        When the Link header numbers its pages (next and last), the remaining
+        pages are fetched concurrently, PREFETCH_WINDOW at a time. Otherwise
+        the next page is requested while the current one is parsed on a worker
+        thread. If parse is given, each item is passed through it as its page
+        is decoded, so only the projected records are kept.
+        """
+        params = dict(params or {})
+        params.setdefault("per_page", PER_PAGE)
+        response = await self.request("GET", path, params=params)
+
+        page_urls = _numbered_page_urls(response)
+        if page_urls:
+            window = asyncio.Semaphore(PREFETCH_WINDOW)
+
+            async def fetch_page(url):
+                async with window:
+                    return await self.request("GET", url)
+
+            pages = await asyncio.gather(*(fetch_page(url) for url in page_urls))
+            items = _page_items(response, parse)
+            for page in pages:
+                items.extend(_page_items(page, parse))
+            return items
+
+        # Bookmark pagination: keep one request in flight while the previous page is parsed
+        # off the event loop (parsing inline would block it and the request couldn't progress).
+        # The last page has nothing to overlap with, so it is parsed inline.
+        # Next links already carry the query string, so don't resend params
+        items = []
+        while response is not None:
+            next_url = response.links.get("next", {}).get("url")
+            if next_url is None:
+                items.extend(_page_items(response, parse))
+                break
+            next_page = asyncio.ensure_future(self.request("GET", next_url))
+            try:
+                items.extend(await asyncio.to_thread(_page_items, response, parse))
+            except BaseException:
+                next_page.cancel()
+                raise
+            response = await next_page
+        return items
+
+# Drop pooled clients that have not been used recently
+def _evict_idle_clients(now: float):
+    """Removes clients idle for longer than CLIENT_IDLE_TIMEOUT."""
+    global _last_pool_sweep
+    if now - _last_pool_sweep < 60:
+        return
+    _last_pool_sweep = now
+    for key, client in list(_client_pool.items()):
+        if now - client.last_used > CLIENT_IDLE_TIMEOUT:
+            del _client_pool[key]
+    logger.debug("Canvas client pool holds %s clients", len(_client_pool))
+
+# Get the pooled client for an API key, creating it if needed
+def get_client(api_key: str) -> CanvasClient:
+    """Returns the pooled CanvasClient for an API key."""
+    now = time.monotonic()
+    _evict_idle_clients(now)
+    key = hash_api_key(api_key)
+    client = _client_pool.get(key)
+    if client is None:
+        logger.info("Creating a pooled Canvas client")
+        client = CanvasClient(api_key)
+        _client_pool[key] = client
+    client.last_used = now
+    return client
+
+# Report rate-limit headroom for every pooled client
+def rate_limit_metrics() -> dict:
+    """Returns each pooled token's limiter state, keyed by a short prefix of its hash."""
+    return {key[:12]: client.rate_limiter.snapshot() for key, client in _client_pool.items()}
@@ -0,0 +1,40 @@
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from typing import Optional
+
+# Parse a Canvas ISO 8601 timestamp (e.g. "2024-11-05T04:59:59Z")
+def parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """Parses a Canvas timestamp into an aware datetime, or None if empty."""
+    if not value:
+        return None
+    # datetime.fromisoformat only accepts a trailing "Z" from Python 3.11 on
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+# Parse a batch of Canvas timestamps into POSIX seconds
+def parse_timestamps(values) -> list:
+    """Parses each timestamp to a float POSIX time (None stays None)."""
+    return [None if not value else parse_timestamp(value).timestamp() for value in values]
+
+# Sorted due-date index for fast window queries
+class DueDateIndex:
+    """Items sorted by due date; window queries are two binary searches and a slice."""
+
+    __slots__ = ("times", "items")
+
+    def __init__(self, items, due_at=lambda item: item.due_at):
+        items = list(items)
+        stamps = parse_timestamps([due_at(item) for item in items])
+        pairs = sorted((stamp, i) for i, stamp in enumerate(stamps) if stamp is not None)
+        self.times = [stamp for stamp, _ in pairs]
+        self.items = [items[i] for _, i in pairs]
+
+    def due_between(self, start: datetime, end: datetime) -> list:
+        """Returns (due datetime, item) pairs for items due in [start, end], earliest first."""
+        lo, hi = bisect_left(self.times, start.timestamp()), bisect_right(self.times, end.timestamp())
+        return [
+            (datetime.fromtimestamp(stamp, timezone.utc), item)
+            for stamp, item in zip(self.times[lo:hi], self.items[lo:hi])
+        ]
@@ -0,0 +1,89 @@
+import json
+import logging
+from canvas_client import CanvasException
+from canvas_models import Assignment, Submission
+
+# Configure logging for this module
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Assignments requested per course per round trip
+PAGE_SIZE = 100
+
+# Fields pulled for every assignment; for a student token the submissions
+# connection only contains the viewer's own submission
+ASSIGNMENT_FIELDS = """
+    _id
+    name
+    dueAt
+    pointsPossible
+    hasSubmittedSubmissions
+    submissionsConnection(first: 1) { nodes { score gradedAt submittedAt } }
+"""
+
+# Build one query that pages through the assignments of several courses at once
+def _build_query(cursors: dict) -> str:
+    """Returns a query with one aliased course(id:) field per course, resuming at each cursor."""
+    fields = []
+    for course_id, cursor in cursors.items():
+        after = f", after: {json.dumps(cursor)}" if cursor else ""
+        fields.append(
+            f'c{course_id}: course(id: "{course_id}") {{ '
+            f"assignmentsConnection(first: {PAGE_SIZE}{after}) {{ "
+            f"nodes {{ {ASSIGNMENT_FIELDS} }} pageInfo {{ hasNextPage endCursor }} }} }}"
+        )
+    return "query EagleTaskCourseAssignments { " + " ".join(fields) + " }"
+
+# Convert one GraphQL assignment node into our records
+def _parse_node(course_id: int, node: dict):
+    assignment = Assignment(
+        int(node['_id']),
+        course_id,
+        node.get('name'),
+        node.get('dueAt'),
+        node.get('pointsPossible'),
+        bool(node.get('hasSubmittedSubmissions')),
+    )
+    submissions = (node.get('submissionsConnection') or {}).get('nodes') or []
+    submission = None
+    if submissions:
+        first = submissions[0]
+        submission = Submission(assignment.id, first.get('score'), first.get('gradedAt'), first.get('submittedAt'))
+    return assignment, submission
+
+# Fetch assignments and the viewer's submissions for many courses in one paginated query
+async def fetch_course_assignments(canvas, course_ids: list) -> dict:
+    """Returns {course_id: (assignments, submissions)}; courses the token can't see map to None."""
+    results = {course_id: ([], []) for course_id in course_ids}
+    cursors = {course_id: None for course_id in course_ids}
+    round_trips = 0
+
+    while cursors:
+        response = await canvas.request("POST", "/api/graphql", json={"query": _build_query(cursors)})
+        payload = response.json()
+        round_trips += 1
+        data = payload.get('data')
+        if payload.get('errors') and not data:
+            raise CanvasException(f"GraphQL error: {payload['errors']}")
+
+        next_cursors = {}
+        for course_id in cursors:
+            course = (data or {}).get(f"c{course_id}")
+            if course is None:
+                # Canvas resolves inaccessible courses to null rather than failing the query
+                results[course_id] = None
+                continue
+            connection = course['assignmentsConnection']
+            assignments, submissions = results[course_id]
+            for node in connection.get('nodes') or []:
+                assignment, submission = _parse_node(course_id, node)
+                assignments.append(assignment)
+                if submission is not None:
+                    submissions.append(submission)
+            page_info = connection.get('pageInfo') or {}
+            if page_info.get('hasNextPage'):
+                next_cursors[course_id] = page_info.get('endCursor')
+        cursors = next_cursors
+
+    logger.info("Fetched assignments for %s courses in %s GraphQL round trips", len(course_ids), round_trips)
+    return results
@@ -0,0 +1,60 @@
+from typing import NamedTuple, Optional
+
+# Lightweight records for the handful of Canvas fields EagleTask uses.
+# Tuples carry no per-instance __dict__, so hundreds of assignments cost a
+# fraction of the memory of the full JSON dicts (or canvasapi objects).
+
+class Course(NamedTuple):
+    id: int
+    name: Optional[str]
+    enrollment_term_id: Optional[int]
+    term_start_at: Optional[str]
+    term_end_at: Optional[str]
+
+    @classmethod
+    def from_json(cls, data: dict) -> "Course":
+        """Builds a Course from a /courses item (with include[]=term)."""
+        term = data.get('term') or {}
+        return cls(
+            data['id'],
+            data.get('name'),
+            data.get('enrollment_term_id', term.get('id')),
+            term.get('start_at'),
+            term.get('end_at'),
+        )
+
+class Assignment(NamedTuple):
+    id: int
+    course_id: int
+    name: Optional[str]
+    due_at: Optional[str]
+    points_possible: Optional[float]
+    has_submitted_submissions: bool
+
+    @classmethod
+    def from_json(cls, data: dict) -> "Assignment":
+        """Builds an Assignment from a /courses/:id/assignments item."""
+        return cls(
+            data['id'],
+            data.get('course_id'),
+            data.get('name'),
+            data.get('due_at'),
+            data.get('points_possible'),
+            bool(data.get('has_submitted_submissions')),
+        )
+
+class Submission(NamedTuple):
+    assignment_id: int
+    score: Optional[float]
+    graded_at: Optional[str]
+    submitted_at: Optional[str]
+
+    @classmethod
+    def from_json(cls, data: dict) -> "Submission":
+        """Builds a Submission from a /courses/:id/students/submissions item."""
+        return cls(
+            data['assignment_id'],
+            data.get('score'),
+            data.get('graded_at'),
+            data.get('submitted_at'),
+        )
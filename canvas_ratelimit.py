@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import random
+import time
+
+# Configure logging for this module
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Bounds on how many requests one token may have in flight
+INITIAL_CONCURRENCY = 4.0
+MIN_CONCURRENCY = 1.0
+MAX_CONCURRENCY = 16.0
+
+# Below this much X-Rate-Limit-Remaining we back off instead of ramping up
+# (Canvas buckets start at 700 and refill continuously)
+LOW_WATER_REMAINING = 150.0
+
+# Multiplicative decreases closer together than this count as one congestion event
+DECREASE_INTERVAL = 1.0
+
+# How often a throttled request is retried before the error is raised
+MAX_THROTTLE_RETRIES = 5
+
+# Parse a numeric rate-limit header, ignoring junk
+def _header_float(headers, name: str):
+    value = headers.get(name)
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+# AIMD concurrency controller for one Canvas token
+class AdaptiveRateLimiter:
+    """Limits in-flight requests for a token and adapts the limit to Canvas's rate-limit headers.
+
+    Every response grows the limit additively while X-Rate-Limit-Remaining is
+    healthy; a low bucket or a throttled (403 Rate Limit Exceeded) response
+    halves it. Callers over the limit wait in a queue instead of failing.
+    """
+
+    def __init__(self):
+        self.limit = INITIAL_CONCURRENCY
+        self.in_flight = 0
+        self.waiting = 0
+        self.remaining = None
+        self.last_cost = None
+        self.total_cost = 0.0
+        self.requests = 0
+        self.throttled = 0
+        self._last_decrease = 0.0
+        self._condition = None
+
+    def _get_condition(self):
+        # Created lazily so it binds to the running event loop
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    async def acquire(self):
+        """Waits until this token has a free request slot."""
+        condition = self._get_condition()
+        async with condition:
+            self.waiting += 1
+            try:
+                await condition.wait_for(lambda: self.in_flight < max(1, int(self.limit)))
+            finally:
+                self.waiting -= 1
+            self.in_flight += 1
+
+    async def release(self):
+        """Frees a request slot and wakes queued callers."""
+        condition = self._get_condition()
+        async with condition:
+            self.in_flight -= 1
+            condition.notify_all()
+
+    def record_response(self, headers):
+        """Updates the bucket estimate and limit from a response's headers."""
+        self.requests += 1
+        remaining = _header_float(headers, "X-Rate-Limit-Remaining")
+        cost = _header_float(headers, "X-Request-Cost")
+        if cost is not None:
+            self.last_cost = cost
+            self.total_cost += cost
+        if remaining is None:
+            return
+        self.remaining = remaining
+        if remaining < LOW_WATER_REMAINING:
+            self._decrease()
+        else:
+            # Additive increase: roughly +1 per limit's worth of responses
+            self.limit = min(MAX_CONCURRENCY, self.limit + 1.0 / self.limit)
+
+    def record_throttled(self):
+        """Halves the limit after Canvas rejected a request for rate limiting."""
+        self.throttled += 1
+        self.remaining = 0.0
+        self._decrease()
+
+    def _decrease(self):
+        now = time.monotonic()
+        if now - self._last_decrease >= DECREASE_INTERVAL:
+            self._last_decrease = now
+            self.limit = max(MIN_CONCURRENCY, self.limit / 2)
+
+    def backoff(self, attempt: int) -> float:
+        """Returns how long to wait before retrying a throttled request."""
+        return min(8.0, 0.5 * 2 ** attempt) * (0.5 + random.random())
+
+    def snapshot(self) -> dict:
+        """Returns the limiter's current state for metrics."""
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "queued": self.waiting,
+            "remaining": self.remaining,
+            "last_cost": self.last_cost,
+            "average_cost": round(self.total_cost / self.requests, 3) if self.requests else None,
+            "requests": self.requests,
+            "throttled": self.throttled,
+        }
@@ -0,0 +1,272 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from canvas_models import Assignment, Course, Submission
+
+# Configure logging for this module
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Location of the snapshot database
+DB_PATH = os.getenv("EAGLETASK_DB_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "eagletask.db"))
+
+# user_id under which course-level data shared by every student is stored
+SHARED_USER_ID = "*"
+
+# Bump when the schema changes; the store is a cache, so older files are rebuilt
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS courses (
+    user_id TEXT NOT NULL,
+    course_id INTEGER NOT NULL,
+    name TEXT,
+    enrollment_term_id INTEGER,
+    term_start_at TEXT,
+    term_end_at TEXT,
+    PRIMARY KEY (user_id, course_id)
+);
+CREATE TABLE IF NOT EXISTS assignments (
+    user_id TEXT NOT NULL,
+    course_id INTEGER NOT NULL,
+    assignment_id INTEGER NOT NULL,
+    name TEXT,
+    due_at TEXT,
+    points_possible REAL,
+    has_submitted_submissions INTEGER,
+    PRIMARY KEY (user_id, course_id, assignment_id)
+);
+CREATE INDEX IF NOT EXISTS idx_assignments_user_course ON assignments (user_id, course_id);
+CREATE INDEX IF NOT EXISTS idx_assignments_due_at ON assignments (due_at);
+CREATE TABLE IF NOT EXISTS submissions (
+    user_id TEXT NOT NULL,
+    course_id INTEGER NOT NULL,
+    assignment_id INTEGER NOT NULL,
+    score REAL,
+    graded_at TEXT,
+    submitted_at TEXT,
+    PRIMARY KEY (user_id, course_id, assignment_id)
+);
+CREATE INDEX IF NOT EXISTS idx_submissions_user_course ON submissions (user_id, course_id);
+CREATE TABLE IF NOT EXISTS sync_state (
+    user_id TEXT NOT NULL,
+    course_id INTEGER NOT NULL,
+    watermark TEXT,
+    last_full_sync REAL,
+    PRIMARY KEY (user_id, course_id)
+);
+CREATE TABLE IF NOT EXISTS planner_items (
+    user_id TEXT NOT NULL,
+    days INTEGER NOT NULL,
+    items TEXT NOT NULL,
+    PRIMARY KEY (user_id, days)
+);
+CREATE TABLE IF NOT EXISTS fetched (
+    user_id TEXT NOT NULL,
+    resource TEXT NOT NULL,
+    course_id INTEGER NOT NULL,
+    fetched_at REAL,
+    PRIMARY KEY (user_id, resource, course_id)
+);
+"""
+
+# Persistent, per-user snapshot of normalized Canvas data
+class CanvasStore:
+    """WAL-mode SQLite store for courses, assignments and submissions.
+
+    user_id is the API key hash (or SHARED_USER_ID for course-level data), so a
+    cold process can answer from disk before it has talked to Canvas. All
+    public methods are coroutines that run the SQLite work on a worker thread.
+    """
+
+    def __init__(self, path: str = DB_PATH):
+        self.path = path
+        self.conn = None
+        self.lock = threading.Lock()
+
+    def _connect(self):
+        """Opens the database on first use and applies the schema."""
+        if self.conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                _drop_tables(conn)
+            conn.executescript(SCHEMA)
+            conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+            self.conn = conn
+            logger.info("Opened Canvas snapshot store at %s", self.path)
+        return self.conn
+
+    async def _run(self, func, *args):
+        """Runs func(conn, *args) on a worker thread, one statement batch at a time."""
+        def call():
+            with self.lock:
+                return func(self._connect(), *args)
+        return await asyncio.to_thread(call)
+
+    async def open(self):
+        """Opens the database ahead of the first query (used to warm up at startup)."""
+        await self._run(lambda conn: None)
+
+    def close(self):
+        """Closes the database connection."""
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+    # Courses
+
+    @staticmethod
+    def _replace_courses(conn, user_id, courses):
+        with conn:
+            conn.execute("DELETE FROM courses WHERE user_id = ?", (user_id,))
+            conn.executemany(
+                "INSERT INTO courses VALUES (?, ?, ?, ?, ?, ?)",
+                [(user_id, *course) for course in courses],
+            )
+            _mark_fetched(conn, user_id, "courses", 0)
+
+    @staticmethod
+    def _load_courses(conn, user_id):
+        if not _was_fetched(conn, user_id, "courses", 0):
+            return None
+        rows = conn.execute(
+            "SELECT course_id, name, enrollment_term_id, term_start_at, term_end_at "
+            "FROM courses WHERE user_id = ? ORDER BY course_id",
+            (user_id,),
+        ).fetchall()
+        return [Course(*row) for row in rows]
+
+    async def save_courses(self, user_id: str, courses: list):
+        """Replaces the stored course list for a user."""
+        await self._run(self._replace_courses, user_id, courses)
+
+    async def load_courses(self, user_id: str):
+        """Returns the stored course list for a user, or None if never saved."""
+        return await self._run(self._load_courses, user_id)
+
+    # Assignments
+
+    @staticmethod
+    def _replace_assignments(conn, user_id, course_id, assignments):
+        with conn:
+            conn.execute("DELETE FROM assignments WHERE user_id = ? AND course_id = ?", (user_id, course_id))
+            conn.executemany(
+                "INSERT INTO assignments VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (user_id, course_id, a.id, a.name, a.due_at, a.points_possible, int(a.has_submitted_submissions))
+                    for a in assignments
+                ],
+            )
+            _mark_fetched(conn, user_id, "assignments", course_id)
+
+    @staticmethod
+    def _load_assignments(conn, user_id, course_id):
+        if not _was_fetched(conn, user_id, "assignments", course_id):
+            return None
+        rows = conn.execute(
+            "SELECT assignment_id, course_id, name, due_at, points_possible, has_submitted_submissions "
+            "FROM assignments WHERE user_id = ? AND course_id = ? ORDER BY assignment_id",
+            (user_id, course_id),
+        ).fetchall()
+        return [Assignment(*row[:5], bool(row[5])) for row in rows]
+
+    async def save_assignments(self, user_id: str, course_id: int, assignments: list):
+        """Replaces the stored assignments of one course for a user."""
+        await self._run(self._replace_assignments, user_id, course_id, assignments)
+
+    async def load_assignments(self, user_id: str, course_id: int):
+        """Returns the stored assignments of one course, or None if never saved."""
+        return await self._run(self._load_assignments, user_id, course_id)
+
+    # Submissions and sync state
+
+    @staticmethod
+    def _save_submissions(conn, user_id, course_id, submissions, watermark, last_full_sync, replace):
+        with conn:
+            if replace:
+                conn.execute("DELETE FROM submissions WHERE user_id = ? AND course_id = ?", (user_id, course_id))
+            conn.executemany(
+                "INSERT OR REPLACE INTO submissions VALUES (?, ?, ?, ?, ?, ?)",
+                [(user_id, course_id, *submission) for submission in submissions],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?, ?)",
+                (user_id, course_id, watermark, last_full_sync),
+            )
+
+    @staticmethod
+    def _load_submissions(conn, user_id, course_id):
+        state = conn.execute(
+            "SELECT watermark, last_full_sync FROM sync_state WHERE user_id = ? AND course_id = ?",
+            (user_id, course_id),
+        ).fetchone()
+        if state is None:
+            return None
+        rows = conn.execute(
+            "SELECT assignment_id, score, graded_at, submitted_at FROM submissions WHERE user_id = ? AND course_id = ?",
+            (user_id, course_id),
+        ).fetchall()
+        submissions = [Submission(*row) for row in rows]
+        return submissions, state["watermark"], state["last_full_sync"]
+
+    async def save_submissions(self, user_id: str, course_id: int, submissions: list,
+                               watermark: str, last_full_sync: float, replace: bool):
+        """Writes synced submissions and the new watermark; replace=True drops older rows first."""
+        await self._run(self._save_submissions, user_id, course_id, submissions, watermark, last_full_sync, replace)
+
+    async def load_submissions(self, user_id: str, course_id: int):
+        """Returns (submissions, watermark, last_full_sync) for one course, or None if never synced."""
+        return await self._run(self._load_submissions, user_id, course_id)
+
+    # Planner items
+
+    @staticmethod
+    def _replace_planner_items(conn, user_id, days, items):
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO planner_items VALUES (?, ?, ?)", (user_id, days, json.dumps(items)))
+
+    @staticmethod
+    def _load_planner_items(conn, user_id, days):
+        row = conn.execute(
+            "SELECT items FROM planner_items WHERE user_id = ? AND days = ?", (user_id, days)
+        ).fetchone()
+        return None if row is None else json.loads(row["items"])
+
+    async def save_planner_items(self, user_id: str, days: int, items: list):
+        """Replaces the stored upcoming planner items for a user and window length."""
+        await self._run(self._replace_planner_items, user_id, days, items)
+
+    async def load_planner_items(self, user_id: str, days: int):
+        """Returns the stored planner items for a user and window length, or None if never saved."""
+        return await self._run(self._load_planner_items, user_id, days)
+
+# Drop every table so the current schema can be recreated
+def _drop_tables(conn):
+    tables = conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall()
+    for (name,) in tables:
+        conn.execute(f"DROP TABLE IF EXISTS {name}")
+    logger.info("Rebuilding Canvas snapshot store for a new schema version")
+
+# Record that a resource was fetched, so an empty result is distinguishable from "never fetched"
+def _mark_fetched(conn, user_id, resource, course_id):
+    conn.execute(
+        "INSERT OR REPLACE INTO fetched VALUES (?, ?, ?, ?)",
+        (user_id, resource, course_id, time.time()),
+    )
+
+def _was_fetched(conn, user_id, resource, course_id):
+    return conn.execute(
+        "SELECT 1 FROM fetched WHERE user_id = ? AND resource = ? AND course_id = ?",
+        (user_id, resource, course_id),
+    ).fetchone() is not None
+
+# Store shared by all requests in this process
+store = CanvasStore()
@@ -0,0 +1,153 @@
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from canvas_client import to_canvas_timestamp
+from canvas_models import Submission
+from canvas_store import store
+
+# Configure logging for this module
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Overlap subtracted from each watermark so changes made mid-sync are not missed
+WATERMARK_OVERLAP = timedelta(minutes=2)
+
+# Force a full re-download this often so deleted or un-graded submissions drop out
+FULL_SYNC_INTERVAL = 6 * 60 * 60
+
+# Snapshots kept in memory; the least recently used are dropped and reloaded from the store when needed
+MAX_SNAPSHOTS = int(os.getenv("SUBMISSION_SYNC_MAX_SNAPSHOTS", "2000"))
+
+# A user's submissions for one course plus the watermark they are current to
+class SubmissionSnapshot:
+    __slots__ = ("submissions", "watermark", "last_full_sync")
+
+    def __init__(self):
+        self.submissions = {}
+        self.watermark = None
+        self.last_full_sync = 0.0
+
+# Incremental submission sync, one snapshot per (user, course)
+class SubmissionSync:
+    """Keeps per-user, per-course submission snapshots current using graded_since/submitted_since."""
+
+    def __init__(self, store=None, max_snapshots: int = MAX_SNAPSHOTS):
+        self.store = store
+        self.max_snapshots = max_snapshots
+        self.snapshots = OrderedDict()
+        self.locks = {}
+        self.full_syncs = 0
+        self.delta_syncs = 0
+
+    async def sync(self, canvas, user_key: str, course_id: int) -> list:
+        """Brings the snapshot for (user_key, course_id) up to date and returns its submissions."""
+        key = (user_key, course_id)
+        async with self._locked(key):
+            snapshot = self.snapshots.get(key) or await self._load_snapshot(user_key, course_id)
+            started_at = datetime.now(timezone.utc)
+            path = f"/api/v1/courses/{course_id}/students/submissions"
+
+            full_sync = snapshot.watermark is None or time.time() - snapshot.last_full_sync > FULL_SYNC_INTERVAL
+            if full_sync:
+                # Full sync: replace the snapshot wholesale
+                submissions = await canvas.get_paginated(path, parse=Submission.from_json)
+                snapshot.submissions = {submission.assignment_id: submission for submission in submissions}
+                snapshot.last_full_sync = time.time()
+                changed = submissions
+                self.full_syncs += 1
+                logger.info("Full submission sync for course ID %s: %s submissions", course_id, len(submissions))
+            else:
+                # Delta sync: only ask for what was graded or submitted since the watermark
+                graded, submitted = await asyncio.gather(
+                    canvas.get_paginated(path, params={"graded_since": snapshot.watermark}, parse=Submission.from_json),
+                    canvas.get_paginated(path, params={"submitted_since": snapshot.watermark}, parse=Submission.from_json),
+                )
+                changed = submitted + graded
+                for submission in changed:
+                    snapshot.submissions[submission.assignment_id] = submission
+                self.delta_syncs += 1
+                logger.info(
+                    "Delta submission sync for course ID %s: %s graded, %s submitted since %s",
+                    course_id, len(graded), len(submitted), snapshot.watermark,
+                )
+
+            snapshot.watermark = to_canvas_timestamp(started_at - WATERMARK_OVERLAP)
+            self._remember(key, snapshot)
+            await self._save_snapshot(user_key, course_id, snapshot, changed, full_sync)
+            return list(snapshot.submissions.values())
+
+    @asynccontextmanager
+    async def _locked(self, key):
+        """Holds the lock for key, dropping it once nobody holds or waits on it."""
+        entry = self.locks.get(key)
+        if entry is None:
+            entry = self.locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self.locks[key]
+
+    def _remember(self, key, snapshot):
+        """Keeps snapshot as the most recently used and drops the oldest past max_snapshots."""
+        self.snapshots[key] = snapshot
+        self.snapshots.move_to_end(key)
+        while len(self.snapshots) > self.max_snapshots:
+            self.snapshots.popitem(last=False)
+
+    async def _load_snapshot(self, user_key: str, course_id: int) -> SubmissionSnapshot:
+        """Restores a snapshot from the store, or returns an empty one."""
+        snapshot = SubmissionSnapshot()
+        if self.store is None:
+            return snapshot
+        try:
+            saved = await self.store.load_submissions(user_key, course_id)
+        except Exception as e:
+            # Fall back to a full sync rather than failing the request
+            logger.warning("Failed to load submission snapshot for course ID %s: %s", course_id, e)
+            saved = None
+        if saved is not None:
+            submissions, snapshot.watermark, snapshot.last_full_sync = saved
+            snapshot.submissions = {submission.assignment_id: submission for submission in submissions}
+        return snapshot
+
+    async def _save_snapshot(self, user_key, course_id, snapshot, changed, full_sync):
+        """Persists the changed submissions and the new watermark."""
+        if self.store is None:
+            return
+        try:
+            await self.store.save_submissions(
+                user_key, course_id, changed, snapshot.watermark, snapshot.last_full_sync, replace=full_sync
+            )
+        except Exception as e:
+            logger.warning("Failed to persist submission snapshot for course ID %s: %s", course_id, e)
+
+    async def load(self, user_key: str, course_id: int):
+        """Returns the last synced submissions without contacting Canvas, or None if never synced."""
+        key = (user_key, course_id)
+        snapshot = self.snapshots.get(key)
+        if snapshot is None:
+            snapshot = await self._load_snapshot(user_key, course_id)
+            if snapshot.watermark is None:
+                return None
+        self._remember(key, snapshot)
+        return list(snapshot.submissions.values())
+
+    def stats(self) -> dict:
+        """Returns counts of snapshots and sync kinds."""
+        return {
+            "snapshots": len(self.snapshots),
+            "locks": len(self.locks),
+            "full_syncs": self.full_syncs,
+            "delta_syncs": self.delta_syncs,
+        }
+
+# Sync engine shared by all requests in this process
+submission_sync = SubmissionSync(store)
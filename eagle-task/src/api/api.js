@@ -23,6 +23,60 @@ export async function getCoursesWithGradedAssignments(apiKey) {
     }
 }
 
+/**
+ * Streams courses and their grades from the FastAPI backend, one course at a time.
+ * 
+ * @param {string} apiKey - The user's Canvas API key.
+ * @param {Function} onCourse - Called with each course as soon as the backend finishes it.
+ * @returns {Promise<Array>} - A promise that resolves to all streamed courses.
+ */
+export async function streamCoursesWithGradedAssignments(apiKey, onCourse) {
+    const response = await fetch(`${BASE_URL}/get-courses-with-graded-assignments/stream`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ api_key: apiKey })
+    });
+    if (!response.ok) {
+        throw new Error(`Error fetching courses with grades: ${response.status}`);
+    }
+
+    // Each line of the body is one JSON object; the last one is a summary
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    const courses = [];
+    let buffer = '';
+    let summary = null;
+
+    const handleLine = (line) => {
+        if (!line.trim()) return;
+        const item = JSON.parse(line);
+        if (item.done) {
+            summary = item;
+            return;
+        }
+        courses.push(item);
+        if (onCourse) onCourse(item);
+    };
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split('\n');
+        buffer = lines.pop();
+        lines.forEach(handleLine);
+    }
+    handleLine(buffer + decoder.decode());
+
+    if (!summary) {
+        throw new Error("Grades stream ended before it finished.");
+    }
+    if (summary.error) {
+        throw new Error(summary.error);
+    }
+    return courses;
+}
+
 /**
  * Sends a POST request to the FastAPI backend to create a task list for the user.
  * 
@@ -44,6 +98,88 @@ export async function createTaskList(apiKey) {
 }
 
 
+/**
+ * Parses Server-Sent Events out of a fetch response body.
+ * 
+ * @param {Response} response - A fetch response with a text/event-stream body.
+ * @param {Function} onEvent - Called with { id, event, data } for each event.
+ */
+async function readServerSentEvents(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) return;
+        buffer += decoder.decode(value, { stream: true });
+        const blocks = buffer.split('\n\n');
+        buffer = blocks.pop();
+        for (const block of blocks) {
+            const message = { id: null, event: 'message', data: '' };
+            for (const line of block.split('\n')) {
+                if (line.startsWith('id: ')) message.id = line.slice(4);
+                else if (line.startsWith('event: ')) message.event = line.slice(7);
+                else if (line.startsWith('data: ')) message.data += line.slice(6);
+            }
+            // Lines starting with ':' are keep-alive comments
+            if (message.data) onEvent({ ...message, data: JSON.parse(message.data) });
+        }
+    }
+}
+
+/**
+ * Creates a task list while streaming progress events from the FastAPI backend.
+ * If the connection drops, it reattaches to the same job with Last-Event-ID
+ * instead of starting over.
+ * 
+ * @param {string} apiKey - The user's Canvas API key.
+ * @param {Function} onProgress - Called with { event, data } for each progress event.
+ * @param {number} retries - Number of reconnect attempts.
+ * @returns {Promise<Object>} - A promise that resolves to the created task list.
+ */
+export async function streamTaskList(apiKey, onProgress, retries = 5) {
+    let jobId = null;
+    let lastEventId = null;
+    let result = null;
+
+    const handleEvent = ({ id, event, data }) => {
+        if (id !== null) lastEventId = id;
+        if (event === 'job') jobId = data.job_id;
+        else if (event === 'done') result = { data };
+        else if (event === 'error') result = { error: data.detail };
+        else if (onProgress) onProgress({ event, data });
+    };
+
+    for (let attempt = 0; attempt <= retries; attempt++) {
+        try {
+            const response = jobId === null
+                ? await fetch(`${BASE_URL}/create-tasks/stream`, {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({ apiKey: apiKey })
+                })
+                : await fetch(`${BASE_URL}/create-tasks/stream/${jobId}`, {
+                    headers: lastEventId !== null ? { 'Last-Event-ID': lastEventId } : {}
+                });
+            if (!response.ok) {
+                throw new Error(`Error creating task list: ${response.status}`);
+            }
+            await readServerSentEvents(response, handleEvent);
+        } catch (error) {
+            console.error(`Task list stream attempt ${attempt + 1} failed:`, error.message);
+            // Without a job id there is nothing to reattach to
+            if (jobId === null) throw error;
+        }
+
+        if (result) {
+            if (result.error) throw new Error(result.error);
+            return result.data;
+        }
+    }
+    throw new Error("Task list stream did not finish after multiple attempts.");
+}
+
 /** 
  * Sends a POST request to analyze the user's grades.
  * 
@@ -64,38 +200,54 @@ export async function analyzeGrades(message, grades) {
     }
 }
 
-/** 
- * Send a dummy request to the backend to wake up the server.
- * Query the base endpoint and wait for the reponse 
+/**
+ * Polls the backend's /ready endpoint until it has started and warmed up.
+ * The first request also wakes the server up if it was sleeping.
+ * 
+ * @param {number} timeout - How long to wait in total, in milliseconds.
+ * @returns {Promise<Object>} - A promise that resolves to the backend's startup report.
  */
-export async function dummyRequest(retries = 5, delay = 5000) {
-    for (let attempt = 1; attempt <= retries; attempt++) {
+export async function waitUntilReady(timeout = 120000) {
+    const deadline = Date.now() + timeout;
+    let delay = 500;
+    while (true) {
         try {
-            const response = await axios.get(`${BASE_URL}/`);
-            console.log("Backend woke up on attempt:", attempt);
-            return response.data.message; // Return the server's message if successful
+            const response = await axios.get(`${BASE_URL}/ready`, { timeout: 30000 });
+            return response.data;
         } catch (error) {
-            console.error(`Attempt ${attempt} failed:`, error.message);
-            if (attempt === retries) {
-                // Throw error after the final attempt
-                throw new Error("Backend did not respond after multiple attempts.");
-            }
-            // Wait for the specified delay before retrying
-            await new Promise((resolve) => setTimeout(resolve, delay));
+            // 503 means started but still warming up; no response means still waking up
+            const retryAfter = Number(error.response?.headers?.['retry-after']);
+            if (retryAfter) delay = retryAfter * 1000;
+            console.log("Backend not ready yet:", error.message);
+        }
+        if (Date.now() + delay > deadline) {
+            throw new Error("Backend did not respond after multiple attempts.");
         }
+        await new Promise((resolve) => setTimeout(resolve, delay));
+        delay = Math.min(delay * 2, 5000);
     }
 }
 
+/** 
+ * Send a dummy request to the backend to wake up the server.
+ * Waits for the backend to report ready and returns its startup report.
+ */
+export async function dummyRequest() {
+    return waitUntilReady();
+}
+
 /**
- * Sends a POST request to the FastAPI backend to validate the Canvas API key,
- * with retry logic to handle backend wake-up delays.
+ * Sends a POST request to the FastAPI backend to validate the Canvas API key.
+ * Waits for the backend to be ready first, then only retries network failures;
+ * a rejected key fails right away.
  * 
  * @param {string} apiKey - The user's Canvas API key.
- * @param {number} retries - Number of retry attempts.
+ * @param {number} retries - Number of retry attempts for network failures.
  * @param {number} delay - Delay between retries in milliseconds.
  * @returns {Promise<Object>} - A promise that resolves to the validation result.
  */
-export async function validateApiKey(apiKey, retries = 25, delay = 5000) {
+export async function validateApiKey(apiKey, retries = 3, delay = 2000) {
+    await waitUntilReady();
     for (let attempt = 1; attempt <= retries; attempt++) {
         try {
             console.log(`Attempt ${attempt} to validate API key.`);
@@ -106,6 +258,9 @@ export async function validateApiKey(apiKey, retries = 25, delay = 5000) {
             return response.data;
         } catch (error) {
             console.error(`Attempt ${attempt} failed:`, error.message);
+            if (error.response && error.response.status < 500) {
+                throw error;
+            }
             if (attempt === retries) {
                 throw new Error("Backend did not respond after multiple attempts.");
             }
@@ -115,7 +270,6 @@ export async function validateApiKey(apiKey, retries = 25, delay = 5000) {
     }
 }
 
-
 /** 
  * Chat with the support resources 
  * 
@@ -155,6 +309,78 @@ export async function chatWithTasks(message, tasks) {
     }
 }
 
+/**
+ * Streams a chat reply from one of the backend's /stream chat endpoints.
+ * 
+ * @param {string} path - The streaming endpoint, e.g. "/support/stream".
+ * @param {Object} body - The request body.
+ * @param {Function} onText - Called with the reply so far each time a token arrives.
+ * @returns {Promise<string>} - A promise that resolves to the full reply.
+ */
+async function streamChatReply(path, body, onText) {
+    const response = await fetch(`${BASE_URL}${path}`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify(body)
+    });
+    if (!response.ok) {
+        throw new Error(`Error streaming chat reply: ${response.status}`);
+    }
+
+    let text = '';
+    let reply = null;
+    let failure = null;
+    await readServerSentEvents(response, ({ event, data }) => {
+        if (event === 'token') {
+            text += data.text;
+            if (onText) onText(text);
+        } else if (event === 'done') {
+            reply = data.response;
+        } else if (event === 'error') {
+            failure = data.detail;
+        }
+    });
+
+    if (failure) throw new Error(failure);
+    if (reply === null) throw new Error("Chat stream ended before the reply finished.");
+    return reply;
+}
+
+/** 
+ * Chat with the support resources, streaming the reply as it is written.
+ * 
+ * @param {string} message - The message to send to the support resources.
+ * @param {Function} onText - Called with the reply so far.
+ * @returns {Promise<string>} - A promise that resolves to the full reply.
+ */
+export async function streamChatWithSupport(message, onText) {
+    return streamChatReply('/support/stream', { prompt: message }, onText);
+}
+
+/** 
+ * Analyze the user's grades, streaming the reply as it is written.
+ * 
+ * @param {string} message - The prompt or message input for analysis.
+ * @param {Array} grades - The grades data retrieved from localStorage.
+ * @param {Function} onText - Called with the reply so far.
+ * @returns {Promise<string>} - A promise that resolves to the full reply.
+ */
+export async function streamAnalyzeGrades(message, grades, onText) {
+    return streamChatReply('/analyze-grades/stream', { prompt: message, grades: grades }, onText);
+}
+
+/** 
+ * Chat with the tasks chat, streaming the reply as it is written.
+ * 
+ * @param {string} message - The message to send to the tasks chat.
+ * @param {Array} tasks - The tasks data retrieved from localStorage.
+ * @param {Function} onText - Called with the reply so far.
+ * @returns {Promise<string>} - A promise that resolves to the full reply.
+ */
+export async function streamChatWithTasks(message, tasks, onText) {
+    return streamChatReply('/chat-tasks/stream', { prompt: message, tasks: tasks }, onText);
+}
+
 /** 
  * Create a mock quiz for the user based on the doc or docx uploaded 
  * 
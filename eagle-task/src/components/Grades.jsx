@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from 'react';
-import { getCoursesWithGradedAssignments, analyzeGrades } from '../api/api';
+import { streamCoursesWithGradedAssignments, streamAnalyzeGrades } from '../api/api';
 import ReactMarkdown from 'react-markdown';
 import LoadingIndicator from './LoadingIndicator';
 
@@ -31,7 +31,7 @@ const Grades = () => {
         if (message.trim() === "") return;
 
         const newMessage = { sender: "user", text: message };
-        const loadingMessage = { sender: "bot", text: "Loading...", isLoading: true };
+        const loadingMessage = { sender: "bot", text: "Loading...", isLoading: true, isPending: true };
 
         setMessages((prevMessages) => [...prevMessages, newMessage, loadingMessage]);
         setInput("");
@@ -39,17 +39,22 @@ const Grades = () => {
 
         try {
             const grades = JSON.parse(localStorage.getItem('courses_with_graded_assignments'));
-            const response = await analyzeGrades(message, grades);
+            const response = await streamAnalyzeGrades(message, grades, (text) => {
+                // Replace the loading indicator with the reply as it streams in
+                setMessages((prevMessages) =>
+                    prevMessages.map((msg) => (msg.isPending ? { sender: "bot", text, isPending: true } : msg))
+                );
+            });
 
             const botMessage = { sender: "bot", text: response };
             setMessages((prevMessages) =>
-                prevMessages.map((msg) => (msg.isLoading ? botMessage : msg))
+                prevMessages.map((msg) => (msg.isPending ? botMessage : msg))
             );
         } catch (error) {
             console.error("Error analyzing grades:", error);
             setMessages((prevMessages) =>
                 prevMessages.map((msg) =>
-                    msg.isLoading ? { sender: "bot", text: "Sorry, something went wrong. Please try again." } : msg
+                    msg.isPending ? { sender: "bot", text: "Sorry, something went wrong. Please try again." } : msg
                 )
             );
         } finally {
@@ -66,8 +71,13 @@ const Grades = () => {
                 return;
             }
 
-            const response = await getCoursesWithGradedAssignments(apiKey);
-            const coursesWithGrades = response;
+            // Show each course as soon as the backend has it, kept in course order
+            const byIndex = (a, b) => a.index - b.index;
+            setCoursesWithGrades([]);
+            const coursesWithGrades = await streamCoursesWithGradedAssignments(apiKey, (course) => {
+                setCoursesWithGrades((prevCourses) => [...prevCourses, course].sort(byIndex));
+            });
+            coursesWithGrades.sort(byIndex);
 
             localStorage.setItem('courses_with_graded_assignments', JSON.stringify(coursesWithGrades));
             setCoursesWithGrades(coursesWithGrades);
@@ -104,9 +114,9 @@ const Grades = () => {
                     </button>
                 </div>
 
-                {loading && <LoadingIndicator loading={loading} />}
+                {loading && coursesWithGrades.length === 0 && <LoadingIndicator loading={loading} />}
 
-                {!loading && (
+                {(!loading || coursesWithGrades.length > 0) && (
                     <div className="space-y-4">
                         {coursesWithGrades.map((course, index) => (
                             <div key={index} className="bg-[#7B313C] rounded-lg p-4">
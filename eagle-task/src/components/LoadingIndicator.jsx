@@ -12,7 +12,7 @@ const loadingMessages = [
     { text: 'EagleTask is loading...', delay: 13500 },
 ];
 
-const LoadingIndicator = ({ loading }) => {
+const LoadingIndicator = ({ loading, status }) => {
     const [currentMessage, setCurrentMessage] = useState(loadingMessages[0].text);
 
     useEffect(() => {
@@ -36,7 +36,7 @@ const LoadingIndicator = ({ loading }) => {
         <div className="flex flex-col justify-center items-center min-h-screen w-full bg-[#7B313C] text-white px-4 sm:px-6">
             <div className="animate-spin rounded-full h-20 w-20 sm:h-28 sm:w-28 border-t-4 border-white border-opacity-75"></div>
             <div className="text-lg sm:text-xl font-semibold text-center mt-6 sm:mt-8">
-                {currentMessage}
+                {status || currentMessage}
             </div>
         </div>
     );
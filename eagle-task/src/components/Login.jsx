@@ -16,6 +16,11 @@ export const Login = ({ setLoggedIn }) => {
         }
     }, [navigate]);
 
+    // Start waking the backend while the user enters their key
+    useEffect(() => {
+        dummyRequest().catch((err) => console.error("Backend wake-up failed:", err));
+    }, []);
+
     const handleSubmit = async (e) => {
         e.preventDefault();
         setLoading(true);
@@ -1,6 +1,6 @@
 import React, { useState, useEffect, useRef } from 'react';
 import ReactMarkdown from 'react-markdown';
-import { chatWithSupport } from '../api/api';
+import { streamChatWithSupport } from '../api/api';
 
 const Support = () => {
     const [messages, setMessages] = useState([]);
@@ -26,24 +26,29 @@ const Support = () => {
         setInput("");
 
         const newMessage = { sender: "user", text: message };
-        const loadingMessage = { sender: "bot", text: "Loading...", isLoading: true };
+        const loadingMessage = { sender: "bot", text: "Loading...", isLoading: true, isPending: true };
 
         setMessages((prevMessages) => [...prevMessages, newMessage, loadingMessage]);
 
         try {
-            const botResponse = await chatWithSupport(message);
+            const botResponse = await streamChatWithSupport(message, (text) => {
+                // Replace the loading indicator with the reply as it streams in
+                setMessages((prevMessages) =>
+                    prevMessages.map((msg) => (msg.isPending ? { sender: "bot", text, isPending: true } : msg))
+                );
+            });
             const botMessage = { sender: "bot", text: botResponse };
 
             setMessages((prevMessages) =>
                 prevMessages.map((msg) =>
-                    msg.isLoading ? botMessage : msg
+                    msg.isPending ? botMessage : msg
                 )
             );
         } catch (error) {
             console.error("Error in sending message:", error);
             setMessages((prevMessages) =>
                 prevMessages.map((msg) =>
-                    msg.isLoading ? { sender: "bot", text: "Sorry, something went wrong. Please try again." } : msg
+                    msg.isPending ? { sender: "bot", text: "Sorry, something went wrong. Please try again." } : msg
                 )
             );
         }
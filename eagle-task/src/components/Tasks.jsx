@@ -3,7 +3,7 @@ import { FaClock, FaCalendarAlt, FaBook } from "react-icons/fa";
 import ReactMarkdown from 'react-markdown';
 import LoadingIndicator from './LoadingIndicator';
 import TaskCalendar from './TaskCalendar';
-import { createTaskList, chatWithTasks } from '../api/api';
+import { streamTaskList, streamChatWithTasks } from '../api/api';
 
 const Tasks = () => {
     const [messages, setMessages] = useState([]);
@@ -13,6 +13,7 @@ const Tasks = () => {
     const [selectedDate, setSelectedDate] = useState(new Date());
     const [loadingResponse, setLoadingResponse] = useState(false);
     const [loadingTasks, setLoadingTasks] = useState(false);
+    const [taskProgress, setTaskProgress] = useState(null);
 
     useEffect(() => {
         const storedData = localStorage.getItem('tasks');
@@ -27,7 +28,12 @@ const Tasks = () => {
 
         try {
             const apiKey = localStorage.getItem('canvasApiKey');
-            const response = await createTaskList(apiKey);
+            const response = await streamTaskList(apiKey, ({ event, data }) => {
+                if (event === 'courses_listed') setTaskProgress(`Found ${data.courses} courses 📚`);
+                else if (event === 'upcoming_fetched') setTaskProgress(`Found ${data.assignments} upcoming assignments in ${data.courses} courses 📝`);
+                else if (event === 'llm_started') setTaskProgress(`Planning ${data.assignments} assignments 🧐`);
+                else if (event === 'token') setTaskProgress('Writing your tasks ✅');
+            });
             const tasks = response.tasks || [];
             localStorage.setItem('tasks', JSON.stringify(tasks));
             setTaskList(tasks);
@@ -36,6 +42,7 @@ const Tasks = () => {
             setTaskList(["Failed to load tasks. Please try again."]);
         } finally {
             setLoadingTasks(false);
+            setTaskProgress(null);
         }
     };
 
@@ -43,7 +50,7 @@ const Tasks = () => {
         if (message.trim() === "") return;
 
         const newMessage = { sender: "user", text: message };
-        const loadingMessage = { sender: "bot", text: "Loading...", isLoading: true };
+        const loadingMessage = { sender: "bot", text: "Loading...", isLoading: true, isPending: true };
 
         setMessages((prevMessages) => [...prevMessages, newMessage, loadingMessage]);
         setInput("");
@@ -51,17 +58,22 @@ const Tasks = () => {
 
         try {
             const tasks = JSON.parse(localStorage.getItem('tasks'));
-            const response = await chatWithTasks(message, tasks);
+            const response = await streamChatWithTasks(message, tasks, (text) => {
+                // Replace the loading indicator with the reply as it streams in
+                setMessages((prevMessages) =>
+                    prevMessages.map((msg) => (msg.isPending ? { sender: "bot", text, isPending: true } : msg))
+                );
+            });
             const botMessage = { sender: "bot", text: response };
 
             setMessages((prevMessages) =>
-                prevMessages.map((msg) => (msg.isLoading ? botMessage : msg))
+                prevMessages.map((msg) => (msg.isPending ? botMessage : msg))
             );
         } catch (error) {
             console.error("Error creating task list:", error);
             setMessages((prevMessages) =>
                 prevMessages.map((msg) =>
-                    msg.isLoading ? { sender: "bot", text: "Sorry, something went wrong. Please try again." } : msg
+                    msg.isPending ? { sender: "bot", text: "Sorry, something went wrong. Please try again." } : msg
                 )
             );
         } finally {
@@ -144,7 +156,7 @@ const Tasks = () => {
                 </div>
                 {isTaskView ? (
                     loadingTasks ? (
-                        <LoadingIndicator loading={loadingTasks} />
+                        <LoadingIndicator loading={loadingTasks} status={taskProgress} />
                     ) : taskList.length > 0 ? (
                         <ul className="space-y-4">
                             {taskList.map((task, index) => (
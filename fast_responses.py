@@ -0,0 +1,136 @@
+import gzip
+import json
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+# orjson and brotli are optional; without them we fall back to json and gzip
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Bodies smaller than this aren't worth compressing
+MINIMUM_COMPRESS_SIZE = 1024
+
+# Compression levels: brotli 4 and gzip 6 are cheap enough to run per response
+BROTLI_QUALITY = 4
+GZIP_LEVEL = 6
+
+# Only text bodies compress well; streamed bodies (SSE, NDJSON) are never buffered
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript")
+
+# Serialize values orjson doesn't know natively
+def _default(value):
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+# Serialize content to compact JSON bytes
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+# JSON response rendered with orjson
+class FastJSONResponse(JSONResponse):
+    """JSONResponse that serializes with orjson when it's installed.
+
+    Returning one from an endpoint also skips FastAPI's jsonable_encoder pass,
+    so content should already be plain JSON types or pydantic models (built
+    with model_construct when the data is already validated).
+    """
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+# Pick the best encoding the client accepts
+def choose_encoding(accept_encoding: str):
+    accepted = {
+        part.split(";")[0].strip().lower()
+        for part in accept_encoding.split(",")
+        if not part.strip().endswith(("q=0", "q=0.0"))
+    }
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+# Compress a body with the chosen encoding
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+# Negotiated brotli/gzip compression for complete (non-streamed) responses
+class CompressionMiddleware:
+    """Compresses single-message responses above a size threshold.
+
+    Streamed responses pass through untouched so SSE and NDJSON lines still
+    reach the client as soon as they're written.
+    """
+
+    def __init__(self, app, minimum_size: int = MINIMUM_COMPRESS_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        encoding = choose_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                # Hold the headers until we've seen the body
+                start = message
+                return
+
+            body = message.get("body", b"")
+            response_headers = {
+                key.lower(): value for key, value in start.get("headers", [])
+            }
+            content_type = response_headers.get(b"content-type", b"").decode("latin-1")
+            if (
+                message.get("more_body", False)
+                or b"content-encoding" in response_headers
+                or len(body) < self.minimum_size
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            ):
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            compressed = compress(body, encoding)
+            new_headers = [
+                (key, value) for key, value in start.get("headers", [])
+                if key.lower() not in (b"content-length", b"vary")
+            ]
+            vary = response_headers.get(b"vary")
+            new_headers += [
+                (b"content-encoding", encoding.encode("latin-1")),
+                (b"content-length", str(len(compressed)).encode("latin-1")),
+                (b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"),
+            ]
+            await send({**start, "headers": new_headers})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
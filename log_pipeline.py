@@ -0,0 +1,116 @@
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+
+# Records waiting for the writer thread; past this we drop rather than block the event loop
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+# Longest message written for one record; big payloads are cut to this
+MAX_MESSAGE_CHARS = int(os.getenv("LOG_MAX_MESSAGE_CHARS", "2000"))
+
+# Fraction of requests logged per route prefix (longest prefix wins); errors are always logged
+DEFAULT_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+ROUTE_SAMPLE_RATES = {
+    "/metrics": 0.0,
+    "/ready": 0.0,
+}
+
+# Cut a string down to the size cap
+def truncate(text: str, limit: int = MAX_MESSAGE_CHARS) -> str:
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}... (+{len(text) - limit} chars)"
+
+# Decide whether to log a request to this path
+def should_sample(path: str) -> bool:
+    rate = DEFAULT_SAMPLE_RATE
+    matched = ""
+    for prefix, prefix_rate in ROUTE_SAMPLE_RATES.items():
+        if path.startswith(prefix) and len(prefix) > len(matched):
+            matched, rate = prefix, prefix_rate
+    return rate >= 1.0 or random.random() < rate
+
+# One JSON object per line, formatted on the writer thread
+class StructuredFormatter(logging.Formatter):
+    """Formats records as JSON lines with any `extra={"fields": {...}}` merged in."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": truncate(record.getMessage()),
+        }
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+# Queue handler that leaves formatting to the writer thread
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Hands records to the writer thread without formatting them first.
+
+    The stock QueueHandler formats in the caller so records can be pickled;
+    ours stay in-process, so the message, args and traceback are rendered on
+    the writer thread instead of the event loop. A full queue drops records.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+_listener = None
+_queue_handler = None
+
+# Route all logging through the queue and a background writer thread
+def setup_logging(level: int = logging.INFO):
+    """Installs the queue handler on the root logger and starts the writer thread."""
+    global _listener, _queue_handler
+    if _listener is not None:
+        return
+
+    log_queue = queue.Queue(LOG_QUEUE_SIZE)
+    writer = logging.StreamHandler(sys.stderr)
+    writer.setFormatter(StructuredFormatter())
+
+    _queue_handler = DeferredQueueHandler(log_queue)
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(_queue_handler)
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, writer, respect_handler_level=True)
+    _listener.start()
+
+# Flush queued records and stop the writer thread
+def shutdown_logging():
+    """Drains the queue, then writes any later records directly."""
+    global _listener
+    if _listener is None:
+        return
+    root = logging.getLogger()
+    root.removeHandler(_queue_handler)
+    _listener.stop()
+    for writer in _listener.handlers:
+        root.addHandler(writer)
+    _listener = None
+
+# Numbers for the metrics endpoint
+def stats() -> dict:
+    if _queue_handler is None:
+        return {"queued": 0, "dropped": 0}
+    return {"queued": _queue_handler.queue.qsize(), "dropped": _queue_handler.dropped}
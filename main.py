@@ -1,16 +1,82 @@
+import time
+_import_started = time.perf_counter()  # Measure how long importing the app takes
+
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 import logging
 import os
 import sys
 from pydantic import BaseModel
+
+# Load environment variables before the app modules read their settings. Skipped
+# (without importing python-dotenv) when there is no .env file, as on Render
+_dotenv_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env")
+if os.path.exists(_dotenv_path):
+    from dotenv import load_dotenv
+    load_dotenv(_dotenv_path)
+
 import canvas_api
+import canvas_cache
+import canvas_client
+import canvas_store
+import canvas_sync
+import log_pipeline
+import openai_client
+import progress_events
+import task_cache
+from fast_responses import CompressionMiddleware, FastJSONResponse, dumps
 from openai_api import router as openai_router  # Import the router
 
-# Logging configuration
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-
-app = FastAPI()
+# Logging configuration: records are queued and written by a background thread
+log_pipeline.setup_logging(logging.INFO)
+
+# How long any one warm-up step may take before we report ready without it
+WARMUP_STEP_TIMEOUT = 10.0
+
+# Startup timings and warm-up state, reported by /ready
+startup = {
+    "ready": False,
+    "import_ms": round((time.perf_counter() - _import_started) * 1000, 1),
+    "warmup_ms": None,
+    "warmup_errors": {},
+}
+
+# Open pooled connections and load lazy dependencies before the first user request
+async def warm_up():
+    started = time.perf_counter()
+    steps = {
+        "canvas_connection": canvas_client.warm_up(),
+        "snapshot_store": canvas_store.store.open(),
+        "openai_connection": openai_client.warm_up(),
+    }
+    results = await asyncio.gather(
+        *(asyncio.wait_for(step, WARMUP_STEP_TIMEOUT) for step in steps.values()), return_exceptions=True
+    )
+    for name, result in zip(steps, results):
+        if isinstance(result, Exception):
+            # A failed step only means the first real request pays for it
+            startup["warmup_errors"][name] = repr(result)
+            logging.warning("Warm-up step %s failed: %r", name, result)
+    startup["warmup_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    startup["ready"] = True
+    logging.info("Imported app in %s ms, warmed up in %s ms", startup["import_ms"], startup["warmup_ms"])
+
+# Warm up in the background so the port opens right away and /ready can answer,
+# then close the shared Canvas and OpenAI connection pools and snapshot store on shutdown
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warm_up_task = asyncio.ensure_future(warm_up())
+    yield
+    warm_up_task.cancel()
+    await canvas_client.close_http_client()
+    await openai_client.close_openai_client()
+    canvas_store.store.close()
+    log_pipeline.shutdown_logging()
+
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 # CORS setup
@@ -21,9 +87,12 @@ app.add_middleware(
     allow_origins=["https://sahilsaoji.github.io", "https://eagletask.onrender.com"],
     allow_credentials=True,
     allow_methods=["GET", "POST", "OPTIONS", "PUT", "PATCH"],
-    allow_headers=["Authorization", "Content-Type", "Accept", "Content-Disposition"],
+    allow_headers=["Authorization", "Content-Type", "Accept", "Content-Disposition", "Last-Event-ID"],
 )
 
+# Compress large JSON responses for students on mobile networks
+app.add_middleware(CompressionMiddleware)
+
 '''
 app.add_middleware(
     CORSMiddleware,
@@ -34,18 +103,21 @@ app.add_middleware(
 )
 '''
 
-# Log incoming requests
+# Log incoming requests: one sampled, structured line per request. Headers and
+# query strings are left out since they carry API keys
 @app.middleware("http")
 async def log_requests(request, call_next):
-    logging.info(f"Request: {request.method} {request.url}")
-    logging.info(f"Headers: {request.headers}")
-    logging.info(f"Origin: {request.headers.get('origin', 'No Origin')}")
-    
-    if request.method == "OPTIONS":
-        logging.info("Handling CORS preflight request.")
-    
+    started = time.perf_counter()
     response = await call_next(request)
-    logging.info(f"Response status: {response.status_code}")
+    path = request.url.path
+    if response.status_code >= 500 or log_pipeline.should_sample(path):
+        logging.info("%s %s -> %d", request.method, path, response.status_code, extra={"fields": {
+            "method": request.method,
+            "path": path,
+            "status": response.status_code,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            "origin": request.headers.get("origin"),
+        }})
     return response
 
 
@@ -62,14 +134,35 @@ async def root():
     logging.info("Root endpoint accessed")
     return {"message": "Hello, FastAPI!"}
 
+# Readiness check: 503 until warm-up has finished, so clients can poll instead of retrying real calls
+@app.get("/ready")
+async def ready():
+    if not startup["ready"]:
+        return FastJSONResponse(startup, status_code=503, headers={"Retry-After": "1"})
+    return startup
+
+# Report cache, sync and Canvas rate-limit state
+@app.get("/metrics")
+async def metrics():
+    return {
+        "canvas_rate_limits": canvas_client.rate_limit_metrics(),
+        "canvas_cache": canvas_cache.cache.stats(),
+        "single_flight": canvas_cache.single_flight.stats(),
+        "negative_cache": canvas_cache.negative_cache.stats(),
+        "submission_sync": canvas_sync.submission_sync.stats(),
+        "progress_jobs": progress_events.stats(),
+        "openai": openai_client.stats(),
+        "task_cache": task_cache.task_cache.stats(),
+        "logging": log_pipeline.stats(),
+    }
+
 # Validate the api key by creating a new canvas instance with it 
 @app.post("/validate-api-key")
 async def validate_api_key(data: CanvasAPIKey):
-    logging.info(f"Validating API Key: {data.api_key}")
+    logging.info("Validating API Key")
     try:
-        canvas = canvas_api.get_canvas_instance(data.api_key)
-        user = canvas.get_current_user()
-        return {"message": "API Key is valid", "user": user.id}
+        user = await canvas_api.get_current_user(data.api_key)
+        return {"message": "API Key is valid", "user": user["id"]}
     except Exception as e:
         logging.error("Failed to validate API Key", exc_info=True)
         raise HTTPException(status_code=401, detail="Invalid API Key")
@@ -77,16 +170,15 @@ async def validate_api_key(data: CanvasAPIKey):
 # API endpoint to fetch courses and graded assignments for Grades Page 
 @app.post("/get-courses-with-graded-assignments")
 async def get_courses_with_graded_assignments(data: CanvasAPIKey):
-    logging.info(f"Fetching courses and graded assignments for API Key: {data.api_key}")
+    logging.info("Fetching courses and graded assignments")
     try:
-        courses = canvas_api.get_courses(data.api_key)
+        courses = await canvas_api.get_courses(data.api_key)
+        graded = await canvas_api.get_graded_assignments_for_courses(data.api_key, courses)
         courses_with_graded_assignments = []
 
-        for course in courses:
-            course_name = getattr(course, 'name', 'Unnamed Course')
-            logging.info(f"Processing course: {course_name} (ID: {course.id})")
-            
-            graded_assignments = canvas_api.get_graded_assignments(data.api_key, course.id)
+        for course, graded_assignments in zip(courses, graded):
+            course_name = course.name or 'Unnamed Course'
+            logging.debug("Processing course: %s (ID: %s)", course_name, course.id)
             
             if graded_assignments:
                 course_details = {
@@ -94,19 +186,59 @@ async def get_courses_with_graded_assignments(data: CanvasAPIKey):
                     "graded_assignments": graded_assignments
                 }
                 courses_with_graded_assignments.append(course_details)
-                logging.info(f"Added course {course_name} with graded assignments")
+                logging.debug("Added course %s with graded assignments", course_name)
             else:
-                logging.info(f"No graded assignments or access issues for course ID: {course.id}")
+                logging.info("No graded assignments or access issues for course ID: %s", course.id)
 
         if not courses_with_graded_assignments:
             logging.info("No courses with graded assignments were found.")
             return {"message": "No courses with graded assignments could be retrieved."}
 
-        logging.info(str(courses_with_graded_assignments))
-        return {"courses_with_graded_assignments": courses_with_graded_assignments}
+        logging.info("Returning %d courses with graded assignments", len(courses_with_graded_assignments))
+        return FastJSONResponse({"courses_with_graded_assignments": courses_with_graded_assignments})
 
     except Exception as e:
         logging.error("Failed to fetch courses and graded assignments", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+# Streaming variant for the Grades Page: one NDJSON line per course as soon as it is ready
+@app.post("/get-courses-with-graded-assignments/stream")
+async def stream_courses_with_graded_assignments(data: CanvasAPIKey):
+    logging.info("Streaming courses and graded assignments")
+    try:
+        courses = await canvas_api.get_courses(data.api_key)
+    except Exception as e:
+        logging.error("Failed to fetch courses", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
 
+    # Lines arrive in completion order; "index" is each course's position so clients can restore the course order
+    positions = {course.id: index for index, course in enumerate(courses)}
+
+    async def generate():
+        courses_with_grades = 0
+        try:
+            async for course, graded_assignments in canvas_api.iter_graded_assignments_for_courses(data.api_key, courses):
+                if not graded_assignments:
+                    logging.info("No graded assignments or access issues for course ID: %s", course.id)
+                    continue
+                courses_with_grades += 1
+                yield dumps({
+                    "index": positions[course.id],
+                    "course_id": course.id,
+                    "course_name": course.name or 'Unnamed Course',
+                    "graded_assignments": graded_assignments
+                }) + b"\n"
+        except Exception as e:
+            # Headers are already sent, so report the failure in the terminal line
+            logging.error("Failed while streaming graded assignments", exc_info=True)
+            yield dumps({"done": True, "error": str(e)}) + b"\n"
+            return
+
+        # Terminal summary line
+        yield dumps({
+            "done": True,
+            "courses": len(courses),
+            "courses_with_graded_assignments": courses_with_grades
+        }) + b"\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
@@ -1,27 +1,21 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
-from docx import Document
+from fastapi import APIRouter, UploadFile, File, HTTPException, Header
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 from typing import Dict
-import openai
 import json
-import os
 import re
-from dotenv import load_dotenv
 import logging
 from typing import List, Optional
-from canvas_api import get_upcoming_assignments
+from canvas_api import DEFAULT_UPCOMING_DAYS, get_upcoming_assignments
+import progress_events
+from openai_client import DEFAULT_MODEL, LONG_TIMEOUT, complete, stream_completion
+from fast_responses import FastJSONResponse
+from task_cache import task_cache, task_list_key
 
 # Set up logger
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
-# Load environment variables
-load_dotenv()
-
-# Set up OpenAI API key
-openai.api_key = os.getenv("OPENAI_API_KEY")
-
 # Initialize a router
 router = APIRouter()
 
@@ -32,6 +26,7 @@ class TaskRequest(BaseModel):
 # Define task list request 
 class TaskListRequest(BaseModel):
     apiKey: str
+    days: int = Field(DEFAULT_UPCOMING_DAYS, ge=1, le=90)  # How far ahead to look for assignments
 
 # Define chat task request
 class TaskChatRequest(BaseModel):
@@ -86,6 +81,22 @@ def initialize_grades_history(user_id: str, grades: List[Course]):
             }
         ]
 
+# Helper function to initialize chat history for tasks
+def initialize_tasks_history(tasks: List[Dict]):
+    if not chat_history_tasks:
+        assistant_instructions = (
+            '''You are a helpful assistant designed to help users plan and organize their tasks. 
+
+            You have identified the following tasks so far and the user will now ask you questions about them.
+
+            Please provide detailed responses to the user's question as text. No JSON or code blocks are needed.
+            
+            Current user tasks: 
+            '''
+            f"{tasks}"
+        )
+        chat_history_tasks.append({"role": "system", "content": assistant_instructions})
+
 # Helper function to initialize chat history for support 
 def initialize_support_history(user_id: str):
     if user_id not in chat_history_support: 
@@ -136,76 +147,137 @@ def initialize_support_history(user_id: str):
             }
         ]
 
-# Endpoint to create a task list based on user input
-@router.post("/create-tasks", response_model=Dict)
-async def generate_task_list(request: TaskListRequest):
-    try:
-        upcoming_tasks = get_upcoming_assignments(request.apiKey)
-        assistant_instructions = (
-            '''You are a helpful assistant designed to create organized task lists for students based on their assignments or workload.
-            Break down tasks into actionable steps with priorities and deadlines where possible.
+# Version of the task list prompt; bump it whenever build_task_list_messages changes
+# so cached task lists generated from the old prompt are no longer used
+TASK_PROMPT_VERSION = 1
 
-            You need to break down the upcoming assignments into tasks and provide a brief description and time estimate for each task.
-            
-            Please return a JSON object directly, without wrapping it in code blocks, ie no triple backticks or json keyword.
-            Please return tasks in order, with the most urgent tasks at the top. 
-            Please return a JSON object in the following format:
-            {
-                "tasks": [
-                    {
-                        "task": "Task name",
-                        "course": "Course name",
-                        "description": "Task description",
-                        "time_estimate": "Estimated time",
-                        "due_date": "Due date"
-                    }
-                ]
-            }
+# Build the prompt that turns upcoming assignments into a task list
+def build_task_list_messages(upcoming_tasks):
+    assistant_instructions = (
+        '''You are a helpful assistant designed to create organized task lists for students based on their assignments or workload.
+        Break down tasks into actionable steps with priorities and deadlines where possible.
 
-            Here are the upcoming assignments you need to break down into tasks:
-            '''
-            f"{upcoming_tasks}"
-        )
+        You need to break down the upcoming assignments into tasks and provide a brief description and time estimate for each task.
+        
+        Please return a JSON object directly, without wrapping it in code blocks, ie no triple backticks or json keyword.
+        Please return tasks in order, with the most urgent tasks at the top. 
+        Please return a JSON object in the following format:
+        {
+            "tasks": [
+                {
+                    "task": "Task name",
+                    "course": "Course name",
+                    "description": "Task description",
+                    "time_estimate": "Estimated time",
+                    "due_date": "Due date"
+                }
+            ]
+        }
 
-        # Initialize a local chat history for this endpoint
-        initialize_tasks = []
-        initialize_tasks.append({"role": "system", "content": assistant_instructions})
+        Here are the upcoming assignments you need to break down into tasks:
+        '''
+        f"{upcoming_tasks}"
+    )
 
-        # Make the OpenAI API call
-        response = openai.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=initialize_tasks,
-        )
+    # Initialize a local chat history for this endpoint
+    return [{"role": "system", "content": assistant_instructions}]
 
-        # Extract the assistant's response
-        reply = response.choices[0].message.content.strip()
-        chat_history_tasks.append({"role": "assistant", "content": reply})
+# Parse the assistant's task list reply into JSON
+def parse_task_list(reply: str):
+    # Remove markdown code block delimiters if present
+    if reply.startswith("```json") and reply.endswith("```"):
+        reply = reply[7:-3].strip()  # Strip the "```json" and "```"
+    return json.loads(reply)
 
-        # Log the reply
-        logger.info(f"Assistant response: {reply}")
+# Record the task list in the task chat history, whether it was generated or cached
+def record_task_list(tasks_json):
+    chat_history_tasks.append({"role": "assistant", "content": json.dumps(tasks_json)})
 
-        # Remove markdown code block delimiters if present
-        if reply.startswith("```json") and reply.endswith("```"):
-            reply = reply[7:-3].strip()  # Strip the "```json" and "```"
+# Parse the assistant's task list reply, failing the request if it isn't JSON
+def _parse_task_list_reply(reply: str):
+    # Log the reply
+    logger.info("Assistant response: %s", reply)
 
-        # Attempt to parse the cleaned response
-        try:
-            tasks_json = json.loads(reply)
-            return JSONResponse(content=tasks_json)
-        
-        except json.JSONDecodeError:
-            logger.error("Failed to parse assistant response as JSON.")
-            raise HTTPException(status_code=500, detail="Failed to parse response as JSON.")
+    # Attempt to parse the cleaned response
+    try:
+        return parse_task_list(reply)
+    except json.JSONDecodeError:
+        logger.error("Failed to parse assistant response as JSON.")
+        raise HTTPException(status_code=500, detail="Failed to parse response as JSON.")
+
+# Endpoint to create a task list based on user input
+@router.post("/create-tasks", response_model=Dict)
+async def generate_task_list(request: TaskListRequest):
+    try:
+        upcoming_tasks = await get_upcoming_assignments(request.apiKey, request.days)
+
+        async def generate():
+            # Make the OpenAI API call
+            reply = await complete(build_task_list_messages(upcoming_tasks), timeout=LONG_TIMEOUT)
+            return _parse_task_list_reply(reply)
+
+        # Unchanged assignments reuse the task list generated for them last time
+        key = task_list_key(upcoming_tasks, DEFAULT_MODEL, TASK_PROMPT_VERSION)
+        tasks_json = await task_cache.get_or_generate(key, generate)
+
+        # Record the assistant's response
+        record_task_list(tasks_json)
+        return FastJSONResponse(content=tasks_json)
 
     except Exception as e:
         logger.error("Error in generate_task_list: %s", str(e))
         raise HTTPException(status_code=500, detail="Error communicating with OpenAI API")
 
+# Crawl Canvas and stream the task list, publishing progress along the way
+async def _create_tasks_job(job, request: TaskListRequest):
+    upcoming_tasks = await get_upcoming_assignments(request.apiKey, request.days, progress=job.publish)
+    streamed = False
+
+    async def generate():
+        nonlocal streamed
+        streamed = True
+        job.publish("llm_started", {"model": DEFAULT_MODEL, "assignments": len(upcoming_tasks)})
+        parts = []
+        tokens = stream_completion(build_task_list_messages(upcoming_tasks), timeout=LONG_TIMEOUT)
+        try:
+            async for token in tokens:
+                parts.append(token)
+                job.publish("token", {"text": token})
+        finally:
+            await tokens.aclose()
+        return _parse_task_list_reply("".join(parts).strip())
+
+    # Shares the cache and the in-flight generation with /create-tasks
+    key = task_list_key(upcoming_tasks, DEFAULT_MODEL, TASK_PROMPT_VERSION)
+    tasks_json = await task_cache.get_or_generate(key, generate)
+    if not streamed:
+        # Cached, or generated by an identical request already in flight
+        job.publish("cache_hit", {"assignments": len(upcoming_tasks)})
+
+    record_task_list(tasks_json)
+    return tasks_json
+
+# Endpoint to create a task list with progress reported over Server-Sent Events
+@router.post("/create-tasks/stream")
+async def stream_task_list(request: TaskListRequest):
+    job = progress_events.start_job(lambda job: _create_tasks_job(job, request))
+    return StreamingResponse(job.stream(), media_type="text/event-stream", headers=progress_events.SSE_HEADERS)
+
+# Endpoint to reattach to a task list job after a dropped connection
+@router.get("/create-tasks/stream/{job_id}")
+async def resume_task_list(job_id: str, last_event_id: Optional[str] = Header(None)):
+    job = progress_events.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired task list job.")
+    return StreamingResponse(
+        job.stream(last_event_id), media_type="text/event-stream", headers=progress_events.SSE_HEADERS
+    )
+
 # Endpoint to analyze grades and provide recommendations
 @router.post("/analyze-grades", response_model=TaskResponse)
 async def analyze_grades(request: GradesRequest):
     user_id = "default_user"  # Replace this with user-specific identification if available
-    logger.info(f"Received request: {request.model_dump()}")
+    logger.info("Received grades analysis request: %s courses, %s-char prompt", len(request.grades), len(request.prompt))
 
     try:
         # Initialize grades chat history if not already done
@@ -215,16 +287,13 @@ async def analyze_grades(request: GradesRequest):
         chat_history_grades[user_id].append({"role": "user", "content": request.prompt})
 
         # Make the OpenAI API call
-        response = openai.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=chat_history_grades[user_id],
-        )
+        reply = await complete(chat_history_grades[user_id])
 
         # Append assistant response to chat history
-        reply = response.choices[0].message.content.strip()
         chat_history_grades[user_id].append({"role": "assistant", "content": reply})
 
-        return TaskResponse(response=reply)
+        # The reply is already a str; skip re-validation and the default encoder
+        return FastJSONResponse(TaskResponse.model_construct(response=reply))
 
     except Exception as e:
         logger.error("Error in analyze_grades: %s", str(e))
@@ -235,7 +304,7 @@ async def analyze_grades(request: GradesRequest):
 async def chat_with_support(request: TaskRequest):
     
     user_id = "default_user"  # Replace this with user-specific identification if available
-    logger.info(f"Received request: {request.model_dump()}")
+    logger.info("Received support request: %s-char prompt", len(request.prompt))
 
     try:
         initialize_support_history(user_id)
@@ -244,17 +313,13 @@ async def chat_with_support(request: TaskRequest):
         chat_history_support[user_id].append({"role": "user", "content": request.prompt})
 
         # Make the OpenAI API call
-        response = openai.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=chat_history_support[user_id],
-        )
+        reply = await complete(chat_history_support[user_id])
 
         # Append assistant response to chat history
-        reply = response.choices[0].message.content.strip()
-        logger.info(f"Assistant response: {reply}")
+        logger.info("Assistant response: %s", reply)
         chat_history_support[user_id].append({"role": "assistant", "content": reply})
 
-        return TaskResponse(response=reply)
+        return FastJSONResponse(TaskResponse.model_construct(response=reply))
 
     except Exception as e:
         logger.error("Error in chat_with_support: %s", str(e))
@@ -265,44 +330,76 @@ async def chat_with_support(request: TaskRequest):
 async def chat_about_tasks(request: TaskChatRequest):
 
     try:
-        tasks = request.tasks
-        assistant_instructions = (
-            '''You are a helpful assistant designed to help users plan and organize their tasks. 
-
-            You have identified the following tasks so far and the user will now ask you questions about them.
-
-            Please provide detailed responses to the user's question as text. No JSON or code blocks are needed.
-            
-            Current user tasks: 
-            '''
-            f"{tasks}"
-        )
-
         # Initialize chat history if it's empty
-        if not chat_history_tasks:
-            chat_history_tasks.append({"role": "system", "content": assistant_instructions})
+        initialize_tasks_history(request.tasks)
 
         chat_history_tasks.append({"role": "user", "content": request.prompt})
 
         # Make the OpenAI API call
-        response = openai.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=chat_history_tasks,
-        )
+        reply = await complete(chat_history_tasks)
 
-        # Extract the assistant's response
-        reply = response.choices[0].message.content.strip()
+        # Record the assistant's response
         chat_history_tasks.append({"role": "assistant", "content": reply})
 
         # Log the reply
-        return TaskResponse(response=reply)
+        return FastJSONResponse(TaskResponse.model_construct(response=reply))
 
     except Exception as e:
         logger.error("Error in generate_task_list: %s", str(e))
         raise HTTPException(status_code=500, detail="Error communicating with OpenAI API")
 
+# Stream a chat reply as Server-Sent Events: "token" events as the model writes,
+# then "done" with the full reply (or "error")
+def stream_chat_reply(history: list, endpoint: str):
+    async def generate():
+        parts = []
+        tokens = stream_completion(history)
+        try:
+            async for token in tokens:
+                parts.append(token)
+                yield progress_events.format_event(len(parts), "token", {"text": token})
+            yield progress_events.format_event(len(parts) + 1, "done", {"response": "".join(parts).strip()})
+        except Exception as e:
+            logger.error("Error in %s: %s", endpoint, e)
+            yield progress_events.format_event(len(parts) + 1, "error", {"detail": "Error communicating with OpenAI API"})
+        finally:
+            # Runs on completion and when the client disconnects; closing the token
+            # stream cancels the upstream completion and frees its slot right away
+            await tokens.aclose()
+            # Either way, keep what the student was shown
+            reply = "".join(parts).strip()
+            if reply:
+                history.append({"role": "assistant", "content": reply})
+
+    return StreamingResponse(generate(), media_type="text/event-stream", headers=progress_events.SSE_HEADERS)
+
+# Streaming variant of /analyze-grades
+@router.post("/analyze-grades/stream")
+async def stream_analyze_grades(request: GradesRequest):
+    user_id = "default_user"  # Replace this with user-specific identification if available
+    initialize_grades_history(user_id, request.grades)
+    chat_history_grades[user_id].append({"role": "user", "content": request.prompt})
+    return stream_chat_reply(chat_history_grades[user_id], "stream_analyze_grades")
+
+# Streaming variant of /support
+@router.post("/support/stream")
+async def stream_chat_with_support(request: TaskRequest):
+    user_id = "default_user"  # Replace this with user-specific identification if available
+    initialize_support_history(user_id)
+    chat_history_support[user_id].append({"role": "user", "content": request.prompt})
+    return stream_chat_reply(chat_history_support[user_id], "stream_chat_with_support")
+
+# Streaming variant of /chat-tasks
+@router.post("/chat-tasks/stream")
+async def stream_chat_about_tasks(request: TaskChatRequest):
+    initialize_tasks_history(request.tasks)
+    chat_history_tasks.append({"role": "user", "content": request.prompt})
+    return stream_chat_reply(chat_history_tasks, "stream_chat_about_tasks")
+
 def extract_text_from_docx(file):
     """Extract text content from a .docx file."""
+    # python-docx pulls in lxml; only quiz uploads need it
+    from docx import Document
     document = Document(file)
     full_text = []
     for paragraph in document.paragraphs:
@@ -313,7 +410,7 @@ def extract_text_from_docx(file):
 async def generate_quiz(file: UploadFile = File(...)):
     try:
         # Log the uploaded file's metadata
-        logging.info(f"Received file: {file.filename} of type {file.content_type}")
+        logging.info("Received file: %s of type %s", file.filename, file.content_type)
 
         # Check file type
         if not file.filename.endswith(('.txt', '.docx')):
@@ -332,7 +429,7 @@ async def generate_quiz(file: UploadFile = File(...)):
             try:
                 text_content = extract_text_from_docx(file.file)  # Parse .docx content
             except Exception as e:
-                logging.error(f"Failed to parse .docx file: {e}")
+                logging.error("Failed to parse .docx file: %s", e)
                 raise HTTPException(
                     status_code=400, detail="Failed to parse .docx file. Ensure it is a valid Word document."
                 )
@@ -363,38 +460,37 @@ async def generate_quiz(file: UploadFile = File(...)):
 
         # Send request to OpenAI
         logging.info("Sending request to OpenAI...")
-        response = openai.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
+        reply = await complete(
+            [
                 {"role": "system", "content": "You are a helpful assistant."},
                 {"role": "user", "content": assistant_instructions},
             ],
+            timeout=LONG_TIMEOUT,
         )
 
         # Extract and clean up the reply
-        reply = response.choices[0].message.content.strip()
 
         # Remove triple backticks and clean JSON
         cleaned_reply = re.sub(r"```json|```", "", reply).strip()
-        logging.error(f"GPT-4 response: {cleaned_reply}")
+        logging.info("GPT-4 response: %s", cleaned_reply)
 
 
         # Parse the response as JSON
         try:
             quiz_json = json.loads(cleaned_reply)
         except json.JSONDecodeError as e:
-            logging.error(f"Failed to parse OpenAI response: {e}")
+            logging.error("Failed to parse OpenAI response: %s", e)
             raise HTTPException(
                 status_code=500,
                 detail="Error parsing OpenAI response. Please try again later.",
             )
 
         logging.info("Quiz successfully generated.")
-        return JSONResponse(content=quiz_json)
+        return FastJSONResponse(content=quiz_json)
 
     except HTTPException as e:
-        logging.error(f"HTTP Exception: {e.detail}")
+        logging.error("HTTP Exception: %s", e.detail)
         raise
     except Exception as e:
-        logging.error(f"Unhandled Exception: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
\ No newline at end of file
+        logging.error("Unhandled Exception: %s", e)
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
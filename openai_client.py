@@ -0,0 +1,132 @@
+import asyncio
+import httpx
+import importlib
+import logging
+import os
+
+# Configure logging for this module
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Model used by every endpoint
+DEFAULT_MODEL = "gpt-4o-mini"
+
+# Completions allowed in flight across the whole process; the rest wait their turn
+MAX_CONCURRENT_COMPLETIONS = int(os.getenv("OPENAI_MAX_CONCURRENT_COMPLETIONS", "32"))
+
+# Per-call timeouts in seconds: chat replies are short, quizzes and task lists are long
+CHAT_TIMEOUT = 60.0
+LONG_TIMEOUT = 120.0
+CONNECT_TIMEOUT = 5.0
+
+# Connection pool to api.openai.com shared by every completion
+POOL_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=120.0)
+
+# Shared client, its HTTP pool and the concurrency cap, created on first use
+_client = None
+_http_client = None
+_completion_limit = None
+
+# Counters for the metrics endpoint
+_counters = {"completions": 0, "streams": 0, "errors": 0, "in_flight": 0, "queued": 0}
+
+def get_openai_client():
+    """Returns the process-wide AsyncOpenAI client.
+
+    The openai package is the slowest import at startup, so it is loaded here
+    on first use (or by warm_up) instead of when the app is imported.
+    """
+    global _client, _http_client
+    if _client is None or _client.is_closed():
+        import openai
+        _http_client = httpx.AsyncClient(
+            limits=POOL_LIMITS,
+            timeout=httpx.Timeout(CHAT_TIMEOUT, connect=CONNECT_TIMEOUT),
+        )
+        _client = openai.AsyncOpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            http_client=_http_client,
+            max_retries=2,
+        )
+        logger.info("Created shared OpenAI client")
+    return _client
+
+def _get_completion_limit():
+    # Created lazily so it binds to the running event loop
+    global _completion_limit
+    if _completion_limit is None:
+        _completion_limit = asyncio.Semaphore(MAX_CONCURRENT_COMPLETIONS)
+    return _completion_limit
+
+class _Slot:
+    """Holds one of the global completion slots, tracking queue and in-flight counts."""
+
+    async def __aenter__(self):
+        _counters["queued"] += 1
+        try:
+            await _get_completion_limit().acquire()
+        finally:
+            _counters["queued"] -= 1
+        _counters["in_flight"] += 1
+
+    async def __aexit__(self, exc_type, exc, tb):
+        _counters["in_flight"] -= 1
+        _get_completion_limit().release()
+        if exc_type is not None and not issubclass(exc_type, (asyncio.CancelledError, GeneratorExit)):
+            _counters["errors"] += 1
+
+# Run one chat completion through the shared client
+async def complete(messages: list, model: str = DEFAULT_MODEL, timeout: float = CHAT_TIMEOUT) -> str:
+    """Returns the assistant's reply text, waiting for a free slot under the global cap."""
+    async with _Slot():
+        response = await get_openai_client().chat.completions.create(
+            model=model,
+            messages=messages,
+            timeout=httpx.Timeout(timeout, connect=CONNECT_TIMEOUT),
+        )
+        _counters["completions"] += 1
+    return (response.choices[0].message.content or "").strip()
+
+# Stream one chat completion through the shared client
+async def stream_completion(messages: list, model: str = DEFAULT_MODEL, timeout: float = CHAT_TIMEOUT):
+    """Yields the reply's text as the model produces it.
+
+    The slot is held until the stream ends; closing the generator early (e.g.
+    when the client disconnects) closes the upstream response too.
+    """
+    async with _Slot():
+        stream = await get_openai_client().chat.completions.create(
+            model=model,
+            messages=messages,
+            stream=True,
+            timeout=httpx.Timeout(timeout, connect=CONNECT_TIMEOUT),
+        )
+        try:
+            async for chunk in stream:
+                token = chunk.choices[0].delta.content if chunk.choices else None
+                if token:
+                    yield token
+            _counters["streams"] += 1
+        finally:
+            await stream.close()
+
+# Load openai and open a pooled connection before the first user request needs it
+async def warm_up():
+    # Only the slow import runs on a worker thread; the client itself is created on the
+    # event loop so a request arriving mid warm-up can't build a second one
+    await asyncio.to_thread(importlib.import_module, "openai")
+    client = get_openai_client()
+    response = await _http_client.head(str(client.base_url))
+    logger.info("Warmed up OpenAI connection (%s)", response.status_code)
+
+# Close the shared client and its pooled connections (called on application shutdown)
+async def close_openai_client():
+    global _client, _http_client
+    if _client is not None:
+        await _client.close()
+        _client = None
+        _http_client = None
+
+# Numbers for the metrics endpoint
+def stats() -> dict:
+    return {**_counters, "limit": MAX_CONCURRENT_COMPLETIONS}
@@ -0,0 +1,123 @@
+import asyncio
+import json
+import logging
+import secrets
+import time
+
+# Configure logging for this module
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# How long a finished job's events stay around for reconnecting clients
+JOB_TTL = 10 * 60
+
+# Send a comment this often so proxies (e.g. Render's) don't close an idle stream
+KEEPALIVE_INTERVAL = 15.0
+
+# Headers for a Server-Sent Events response
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",
+}
+
+# Format one Server-Sent Event
+def format_event(event_id: int, event: str, data) -> str:
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+
+# A background job whose progress is recorded as numbered events
+class ProgressJob:
+    """Runs work detached from any one connection and keeps every event it published.
+
+    Listeners replay the events after the last id they saw and then follow
+    live ones, so a client that reconnects with Last-Event-ID picks up where
+    it left off instead of restarting the work.
+    """
+
+    def __init__(self, job_id: str):
+        self.id = job_id
+        self.events = []
+        self.finished = False
+        self.finished_at = None
+        self.task = None
+        self._changed = asyncio.Event()
+
+    def publish(self, event: str, data):
+        """Records an event and wakes every listener."""
+        self.events.append((len(self.events), event, data))
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def _finish(self):
+        self.finished = True
+        self.finished_at = time.monotonic()
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def stream(self, last_event_id=None):
+        """Yields the events after `last_event_id` as SSE text until the job finishes."""
+        try:
+            position = int(last_event_id) + 1 if last_event_id is not None else 0
+        except ValueError:
+            position = 0
+        while True:
+            # Grab the wake-up event before checking so a publish in between isn't missed
+            changed = self._changed
+            while position < len(self.events):
+                yield format_event(*self.events[position])
+                position += 1
+            if self.finished:
+                return
+            try:
+                await asyncio.wait_for(changed.wait(), KEEPALIVE_INTERVAL)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+
+# Jobs by id; the unguessable id is what lets a client reattach
+jobs = {}
+
+# Drop finished jobs nobody can still be waiting on
+def _prune_jobs():
+    now = time.monotonic()
+    for job_id in [job_id for job_id, job in jobs.items() if job.finished and now - job.finished_at > JOB_TTL]:
+        del jobs[job_id]
+
+# Start work in the background and return its job
+def start_job(work) -> ProgressJob:
+    """Runs `await work(job)` in the background.
+
+    The job publishes a "job" event with its id first, then whatever the work
+    publishes, and ends with a "done" event carrying the work's result or an
+    "error" event.
+    """
+    _prune_jobs()
+    job = ProgressJob(secrets.token_urlsafe(16))
+    jobs[job.id] = job
+    job.publish("job", {"job_id": job.id})
+
+    async def run():
+        try:
+            result = await work(job)
+            job.publish("done", result)
+        except asyncio.CancelledError:
+            job.publish("error", {"detail": "Job was cancelled"})
+            raise
+        except Exception as e:
+            logger.error("Job %s failed: %s", job.id, e, exc_info=True)
+            detail = getattr(e, "detail", None) or "Internal server error"
+            job.publish("error", {"detail": detail})
+        finally:
+            job._finish()
+
+    job.task = asyncio.ensure_future(run())
+    return job
+
+# Look up a job a client wants to reattach to
+def get_job(job_id: str):
+    _prune_jobs()
+    return jobs.get(job_id)
+
+# Numbers for the metrics endpoint
+def stats() -> dict:
+    running = sum(1 for job in jobs.values() if not job.finished)
+    return {"jobs": len(jobs), "running": running}
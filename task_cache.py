@@ -0,0 +1,155 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from canvas_cache import CanvasCache, single_flight
+
+# Configure logging for this module
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# How long a generated task list is reused for the same assignments, in seconds
+TASK_CACHE_TTL = int(os.getenv("TASK_CACHE_TTL", str(6 * 60 * 60)))
+
+# Upper bound on the approximate size of task lists held in memory
+TASK_CACHE_MAX_BYTES = int(os.getenv("TASK_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+
+# Optional disk tier: a directory of <key>.json files that survives restarts
+TASK_CACHE_DIR = os.getenv("TASK_CACHE_DIR")
+TASK_CACHE_DISK_MAX_BYTES = int(os.getenv("TASK_CACHE_DISK_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Normalize one upcoming assignment so formatting noise doesn't change the key
+def _normalize(value):
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items()}
+    if isinstance(value, str):
+        return " ".join(value.split())
+    return value
+
+# Content address for a task list
+def task_list_key(upcoming: list, model: str, prompt_version: int) -> str:
+    """Hashes the upcoming assignments (order-insensitive), the model and the prompt version."""
+    items = sorted(json.dumps(_normalize(item), sort_keys=True) for item in upcoming)
+    payload = json.dumps({"model": model, "prompt_version": prompt_version, "items": items})
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+# Generated task lists by content address, in memory with an optional disk tier
+class TaskListCache:
+    """Caches parsed task lists for TASK_CACHE_TTL seconds.
+
+    Memory is a byte-bounded LRU; when TASK_CACHE_DIR is set, entries are also
+    written there and the oldest files are removed past the disk bound.
+    """
+
+    def __init__(self, directory: str = TASK_CACHE_DIR, ttl: float = TASK_CACHE_TTL,
+                 max_bytes: int = TASK_CACHE_MAX_BYTES, disk_max_bytes: int = TASK_CACHE_DISK_MAX_BYTES):
+        self.directory = directory
+        self.ttl = ttl
+        self.disk_max_bytes = disk_max_bytes
+        self.memory = CanvasCache(max_bytes=max_bytes, ttls={"tasks": ttl})
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _read_disk(self, key: str):
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return None
+        age = time.time() - stored.get("created_at", 0)
+        if age >= self.ttl:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return stored["tasks"], self.ttl - age
+
+    def _write_disk(self, key: str, tasks):
+        os.makedirs(self.directory, exist_ok=True)
+        # Write to a temp file and rename so readers never see a partial entry
+        temp_path = f"{self._path(key)}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"created_at": time.time(), "tasks": tasks}, f)
+        os.replace(temp_path, self._path(key))
+        self._evict_disk()
+
+    def _evict_disk(self):
+        files = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                stat = os.stat(os.path.join(self.directory, name))
+                files.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in files)
+        for _, size, name in sorted(files):
+            if total <= self.disk_max_bytes:
+                break
+            os.remove(os.path.join(self.directory, name))
+            total -= size
+
+    async def get(self, key: str):
+        """Returns the cached task list for key, or None."""
+        entry = self.memory.get(("tasks", key))
+        if entry is not None and time.monotonic() < entry.fresh_until:
+            self.hits += 1
+            return entry.value
+
+        if self.directory:
+            try:
+                stored = await asyncio.to_thread(self._read_disk, key)
+            except Exception as e:
+                logger.warning("Failed to read task list cache: %s", e)
+                stored = None
+            if stored is not None:
+                tasks, remaining = stored
+                self.memory.set(("tasks", key), tasks, ttl=remaining)
+                self.disk_hits += 1
+                return tasks
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, tasks):
+        """Stores a parsed task list under key."""
+        self.memory.set(("tasks", key), tasks)
+        if self.directory:
+            try:
+                await asyncio.to_thread(self._write_disk, key, tasks)
+            except Exception as e:
+                logger.warning("Failed to write task list cache: %s", e)
+
+    async def get_or_generate(self, key: str, generate):
+        """Returns the cached task list for key, or awaits generate() and caches its result.
+
+        Identical requests already generating share one call.
+        """
+        tasks = await self.get(key)
+        if tasks is not None:
+            return tasks
+
+        async def fill():
+            tasks = await generate()
+            await self.set(key, tasks)
+            return tasks
+
+        return await single_flight.do(("tasks", key), fill)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self.memory.entries),
+            "bytes": self.memory.total_bytes,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "disk": bool(self.directory),
+        }
+
+# Shared cache instance
+task_cache = TaskListCache()